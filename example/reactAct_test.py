@@ -1,5 +1,7 @@
 import os
 from uuid import uuid4
+
+import grpc
 from minimal_agent.agent.react_agent import ReActAgent
 from minimal_agent.llm.qwen import Qwen
 from minimal_agent.memory.base import ListMemory
@@ -7,39 +9,74 @@ from minimal_agent.tools.websearch import SearxngWebSearch
 from minimal_agent.tools.python_executor import PythonExecutor
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.sampling import ParentBasedTraceIdRatio
+from opentelemetry.exporter.otlp.proto.grpc.exporter import Compression
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 from opentelemetry.sdk.resources import Resource
 from opentelemetry import trace
 
 
-resource = Resource(
-    attributes={
-        "service.name": "minimal_agent",
-        "service.namespace": "react_agent",
-        "service.instance.id": str(uuid4()),
-    }
-)
+GRPC_KEEPALIVE_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+
+class KeepaliveOTLPSpanExporter(OTLPSpanExporter):
+    """OTLP span exporter whose gRPC channel keeps the HTTP/2 connection alive."""
+
+    def __init__(
+        self, endpoint: str, compression: Compression | None = None, **kwargs
+    ) -> None:
+        super().__init__(
+            endpoint=endpoint, insecure=True, compression=compression, **kwargs
+        )
+        self._channel.close()
+        self._channel = grpc.insecure_channel(
+            self._endpoint, options=GRPC_KEEPALIVE_OPTIONS, compression=compression
+        )
+        self._client = self._stub(self._channel)
+
 
-trace.set_tracer_provider(TracerProvider(resource=resource))
+if __name__ == "__main__":
+    resource = Resource(
+        attributes={
+            "service.name": "minimal_agent",
+            "service.namespace": "react_agent",
+            "service.instance.id": str(uuid4()),
+        }
+    )
 
-otlp_exporter = OTLPSpanExporter(endpoint=os.environ['OTLP_ENDPOINT'], insecure=True)
-span_processor = BatchSpanProcessor(otlp_exporter)
-trace.get_tracer_provider().add_span_processor(span_processor)
+    # Sample whole traces; child spans follow their parent's decision.
+    sampler = ParentBasedTraceIdRatio(float(os.environ.get("TRACE_SAMPLE_RATIO", "0.1")))
+    trace.set_tracer_provider(TracerProvider(resource=resource, sampler=sampler))
 
+    otlp_exporter = KeepaliveOTLPSpanExporter(
+        endpoint=os.environ['OTLP_ENDPOINT'], compression=Compression.Gzip
+    )
+    span_processor = BatchSpanProcessor(
+        otlp_exporter,
+        max_queue_size=4096,
+        schedule_delay_millis=1000,
+        max_export_batch_size=256,
+        export_timeout_millis=10000,
+    )
+    trace.get_tracer_provider().add_span_processor(span_processor)
 
-agent = ReActAgent(
-    llm_provider=Qwen(
-        access_key=os.environ.get("QWEN_ACCESS_KEY"),
-        model_name="qwen-plus",
-    ),
-    tools=[
-        SearxngWebSearch(
-            searx_host=os.environ.get('SEARXNG_HOST', 'http://localhost:8888'),
-            count=3,
+    agent = ReActAgent(
+        llm_provider=Qwen(
+            access_key=os.environ.get("QWEN_ACCESS_KEY"),
+            model_name="qwen-plus",
         ),
-        PythonExecutor(is_allow_any=True, storage_path='./test/pic/')
-    ],
-    memory=ListMemory(),
-)
+        tools=[
+            SearxngWebSearch(
+                searx_host=os.environ.get('SEARXNG_HOST', 'http://localhost:8888'),
+                count=3,
+            ),
+            PythonExecutor(is_allow_any=True, storage_path='./test/pic/')
+        ],
+        memory=ListMemory(),
+    )
 
-print(agent.run("Draw a chart of Alibaba's stock changes over the last 7 days."))
+    print(agent.run("Draw a chart of Alibaba's stock changes over the last 7 days."))
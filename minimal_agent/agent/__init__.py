@@ -1,4 +1,3 @@
 from .react_agent import ReActAgent
-from .cot_react_agent import CoTReActAgent
 
-__all__ = ["ReActAgent", "CoTReActAgent"]
+__all__ = ["ReActAgent"]
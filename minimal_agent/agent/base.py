@@ -1,11 +1,20 @@
+import asyncio
+import contextvars
+import io
 import json
 import re
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any, NamedTuple
 
 from pydantic import BaseModel
 
+from minimal_agent import _json
 from minimal_agent.llm.base import LLMProviderType
-from minimal_agent.memory.base import ListMemory, MemoryType
+from minimal_agent.memory.base import ListMemory, MemoryEntry, MemoryType
 from minimal_agent.message import Message
 from minimal_agent.tools.base import ToolType, ToolsTypeEnum
 
@@ -13,6 +22,42 @@ from minimal_agent.tools.base import ToolType, ToolsTypeEnum
 from opentelemetry import trace
 from opentelemetry.trace.status import Status, StatusCode
 
+_RESPONSE_TOKEN_RE = re.compile(
+    r"(?P<answer>Answer:)|(?P<thought>Thought:)"
+    r"|(?P<input>Action Input:\s*)|Action:\s*(?P<action>\w*)"
+)
+# Only used by the lenient fallback when the params are not valid JSON.
+_BRACED_INPUT_RE = re.compile(r"({.*?})", re.DOTALL)
+_CODE_BLOCK_RE = re.compile(r"```(.*?)\n(.*?)```", re.DOTALL)
+_JSON_DECODER = json.JSONDecoder()
+_MAX_RESULT_ATTR_LENGTH = 4096
+_TRUNCATION_MARKER = "... [truncated]"
+
+
+class ParsedResponse(NamedTuple):
+    answer: str | None
+    tool_calls: list[dict]
+
+
+def _decode_params(content: str, start: int, end: int) -> Any:
+    # Fast path: the params usually run to the end of the action's text.
+    try:
+        return _json.loads(content[start:end])
+    except ValueError:
+        pass
+    # raw_decode reads exactly one JSON value, however deeply nested.
+    try:
+        params, _ = _JSON_DECODER.raw_decode(content, start)
+        return params
+    except ValueError:
+        return None
+
+
+def _shorten(content: str, limit: int | None) -> str:
+    if limit is None or len(content) <= limit + len(_TRUNCATION_MARKER):
+        return content
+    return content[:limit] + _TRUNCATION_MARKER
+
 
 class AgentConfig(BaseModel):
     max_iterations: int = 10
@@ -20,6 +65,15 @@ class AgentConfig(BaseModel):
     temperature: float = 0.7
     timeout: float = 60.0
     model: str = "qwen-plus"
+    # Max number of tool calls from a single LLM response dispatched concurrently.
+    # The default of 1 keeps the classic one-action-per-step ReAct behaviour.
+    tool_concurrency_limit: int = 1
+    # Emit spans for per-step internals (parsing, memory formatting, tool calls).
+    detailed_tracing: bool = False
+    # Observations from earlier steps are cut to this many characters in the
+    # history sent to the LLM; only the latest step's observations stay whole.
+    # None keeps every observation verbatim.
+    observation_history_chars: int | None = 512
 
 
 class AgentBase(ABC):
@@ -32,87 +86,169 @@ class AgentBase(ABC):
     ) -> None:
         self._llm = llm_provider
         self.tools = {tool._meta.name: tool for tool in tools or []}
-        self.memory = memory or ListMemory()
+        self.memory = memory if memory is not None else ListMemory()
         self.config = config or AgentConfig()
         self.state: dict = {"is_complete": False}
         # Initialize tracer for the base class
         self.tracer = trace.get_tracer("minimal_agent.agents.base")
+        self._detailed_tracing = self.config.detailed_tracing
+        self._tool_pool = (
+            ThreadPoolExecutor(max_workers=self.config.tool_concurrency_limit)
+            if self.config.tool_concurrency_limit > 1
+            else None
+        )
+        # The tool set is fixed between add_tool() calls, so format it only once.
+        self._tool_descriptions_cache = self._build_tool_descriptions()
+        # LRU of observations keyed on (tool name, canonical JSON params).
+        self._tool_cache: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self._tool_cache_max = 128
+        self._tool_cache_lock = threading.Lock()
+
+    def add_tool(self, tool: ToolType) -> None:
+        self.tools[tool._meta.name] = tool
+        self._tool_descriptions_cache = self._build_tool_descriptions()
+        with self._tool_cache_lock:
+            self._tool_cache.clear()
+
+    def _detail_span(self, name: str) -> AbstractContextManager[trace.Span]:
+        """Start a span only when detailed tracing is on; otherwise yield a no-op span."""
+        if self._detailed_tracing:
+            return self.tracer.start_as_current_span(name)
+        return nullcontext(trace.INVALID_SPAN)
 
     def reset(self) -> None:
         with self.tracer.start_as_current_span("agent.reset"):
             self.state = {"is_complete": False}
 
     def _get_tool_descriptions(self) -> str:
-        with self.tracer.start_as_current_span("get_tool_descriptions") as span:
+        return self._tool_descriptions_cache
+
+    def _build_tool_descriptions(self) -> str:
+        with self.tracer.start_as_current_span("build_tool_descriptions") as span:
             span.set_attribute("tools.count", len(self.tools))
 
             if not self.tools:
                 return "No tools available."
 
-            descriptions = []
-            for name, tool in self.tools.items():
-                param = tool._meta.args
-                params_desc = [
-                    f"- {p.arg_name}: {p.arg_desc} ({p.arg_type}"
-                    + (", required" if p.required else "")
-                    + ")"
-                    for p in param
-                ]
-
-                param_text = "\n".join(params_desc) if params_desc else "No parameters."
-
-                descriptions.append(
-                    f"Tool: {name}\n"
-                    f"Description: {tool._meta.description}\n"
-                    f"Parameters:\n{param_text}\n"
-                )
-
-            return "\n".join(descriptions)
+            buf = io.StringIO()
+            for i, (name, tool) in enumerate(self.tools.items()):
+                if i:
+                    buf.write("\n")
+                buf.write("Tool: ")
+                buf.write(name)
+                buf.write("\nDescription: ")
+                buf.write(tool._meta.description)
+                buf.write("\nParameters:\n")
+
+                params = tool._meta.args
+                if not params:
+                    buf.write("No parameters.\n")
+                for p in params:
+                    buf.write("- ")
+                    buf.write(p.arg_name)
+                    buf.write(": ")
+                    buf.write(p.arg_desc)
+                    buf.write(" (")
+                    buf.write(str(p.arg_type))
+                    if p.required:
+                        buf.write(", required")
+                    buf.write(")\n")
+
+            return buf.getvalue()
+
+    @staticmethod
+    def _entry_to_message(entry: MemoryEntry) -> Message:
+        # Tool observations and other non-chat roles are replayed as assistant turns.
+        role = entry.role if entry.role in ["user", "assistant", "system"] else "assistant"
+        return Message(role=role, content=entry.content, metadata=entry.metadata)
+
+    def _shorten_message(self, message: Message) -> Message:
+        content = _shorten(message.content, self.config.observation_history_chars)
+        if content is message.content:
+            return message
+        return Message(role=message.role, content=content, metadata=message.metadata)
 
     def _format_messages_from_memory(self, limit: int = 10) -> list[Message]:
-        with self.tracer.start_as_current_span("format_messages_from_memory") as span:
+        with self._detail_span("format_messages_from_memory") as span:
             span.set_attribute("memory.limit", limit)
 
             entries = self.memory.get_recent(limit)
-            messages = []
+            latest_step = next(
+                (e.metadata.get("step") for e in reversed(entries) if e.role == "observation"),
+                None,
+            )
 
+            messages = []
             for entry in entries:
-                if entry["role"] in ["user", "assistant", "system"]:
-                    messages.append(
-                        Message(
-                            role=entry["role"],
-                            content=entry["content"],
-                            metadata=entry["metadata"]
-                        )
-                    )
-                else:
-                    messages.append(
-                        Message(
-                            role="assistant",
-                            content=entry["content"],
-                            metadata=entry["metadata"]
-                        )
-                    )
+                message = self._entry_to_message(entry)
+                if entry.role == "observation" and entry.metadata.get("step") != latest_step:
+                    message = self._shorten_message(message)
+                messages.append(message)
 
             span.set_attribute("messages.count", len(messages))
             return messages
 
-    def _parse_tool_call(self, content: str) -> dict | None:
-        with self.tracer.start_as_current_span("parse_tool_call") as span:
+    def _parse_response(self, content: str) -> ParsedResponse:
+        with self._detail_span("parse_response") as span:
             span.set_attribute("content.length", len(content))
 
-            # Action: tool_name
-            # Action Input: {"param1": "value1", "param2": "value2"}
-            action_match = re.search(r"Action:\s*(\w+)", content)
-            if not action_match:
+            # One pass over the response collects every marker we care about.
+            answer_start = answer_end = None
+            # Offsets of every `Action:`; each one owns the text up to the next.
+            boundaries: list[int] = []
+            # (tool name, end of the `Action: name` match, its 1-based boundary index)
+            actions: list[tuple[str, int, int]] = []
+            # boundary index -> offset of the first `Action Input:` value after it
+            input_starts: dict[int, int] = {}
+            for match in _RESPONSE_TOKEN_RE.finditer(content):
+                kind = match.lastgroup
+                if kind == "answer":
+                    if answer_start is None:
+                        answer_start = match.end()
+                elif kind == "thought":
+                    if answer_start is not None and answer_end is None:
+                        answer_end = match.start()
+                elif kind == "action":
+                    boundaries.append(match.start())
+                    if match.group("action"):
+                        actions.append((match.group("action"), match.end(), len(boundaries)))
+                elif kind == "input":
+                    input_starts.setdefault(len(boundaries), match.end())
+
+            has_action = bool(boundaries)
+            answer = None
+            if answer_start is not None and not has_action:
+                answer = content[answer_start:answer_end].strip()
+
+            tool_calls = []
+            for tool_name, start, index in actions:
+                end = boundaries[index] if index < len(boundaries) else len(content)
+                tool_calls.append(
+                    self._parse_tool_call(
+                        tool_name, content, start, end, input_starts.get(index)
+                    )
+                )
+
+            if answer is None and not has_action:
                 span.set_status(Status(StatusCode.ERROR, "No action match found"))
-                return None
+            span.set_attribute("tool_calls.count", len(tool_calls))
+            return ParsedResponse(answer=answer, tool_calls=tool_calls)
 
-            tool_name = action_match.group(1)
+    def _parse_tool_call(
+        self,
+        tool_name: str,
+        content: str,
+        start: int,
+        end: int,
+        input_start: int | None,
+    ) -> dict:
+        with self._detail_span("parse_tool_call") as span:
+            # Action: tool_name
+            # Action Input: {"param1": "value1", "param2": "value2"}
             span.set_attribute("tool.name", tool_name)
             if 'executor' in tool_name:
                 # code message using markdown
-                code_match = re.search(r"```(.*?)\n(.*?)```", content, re.DOTALL)
+                code_match = _CODE_BLOCK_RE.search(content, start, end)
                 span.set_attribute("language", code_match.group(1) if code_match else "unknown")
                 span.set_attribute('code', code_match.group(2) if code_match else "unknown")
                 if code_match:
@@ -124,33 +260,87 @@ class AgentBase(ABC):
                     }
 
 
-            input_match = re.search(r"Action Input:\s*({.*?})", content, re.DOTALL)
-            if not input_match:
+            if input_start is None:
                 span.set_attribute("params.empty", True)
                 return {"tool": tool_name, "params": {}}
 
-            try:
-                params = json.loads(input_match.group(1))
+            params = _decode_params(content, input_start, end)
+            if isinstance(params, dict):
                 span.set_attribute("params.count", len(params))
                 return {"tool": tool_name, "params": params}
-            except json.JSONDecodeError:
-                span.set_status(
-                    Status(StatusCode.ERROR, "JSON decode error for params")
-                )
-                params_text = input_match.group(1)
-                params = {}
 
-                for line in params_text.strip().split("\n"):
-                    if ":" in line:
-                        key, value = line.split(":", 1)
-                        params[key.strip()] = value.strip()
+            input_match = _BRACED_INPUT_RE.match(content, input_start, end)
+            if not input_match:
+                span.set_attribute("params.empty", True)
+                return {"tool": tool_name, "params": {}}
 
-                span.set_attribute("params.count", len(params))
-                span.set_attribute("params.fallback_parsing", True)
-                return {"tool": tool_name, "params": params}
+            span.set_status(
+                Status(StatusCode.ERROR, "JSON decode error for params")
+            )
+            params_text = input_match.group(1)
+            params = {}
+
+            for line in params_text.strip().split("\n"):
+                if ":" in line:
+                    key, value = line.split(":", 1)
+                    params[key.strip()] = value.strip()
+
+            span.set_attribute("params.count", len(params))
+            span.set_attribute("params.fallback_parsing", True)
+            return {"tool": tool_name, "params": params}
+
+    def _call_tools(self, tool_calls: list[dict]) -> list[str]:
+        if self._tool_pool is None or len(tool_calls) < 2:
+            return [self._call_tool(tc["tool"], tc["params"]) for tc in tool_calls]
+
+        # Copy the caller's context so tool spans stay parented to the current span.
+        return list(
+            self._tool_pool.map(
+                lambda tc, ctx: ctx.run(self._call_tool, tc["tool"], tc["params"]),
+                tool_calls,
+                [contextvars.copy_context() for _ in tool_calls],
+            )
+        )
+
+    async def _call_tools_async(self, tool_calls: list[dict]) -> list[str]:
+        semaphore = asyncio.Semaphore(max(self.config.tool_concurrency_limit, 1))
+
+        async def _limited(tool_call: dict) -> str:
+            async with semaphore:
+                return await self._call_tool_async(
+                    tool_call["tool"], tool_call["params"]
+                )
+
+        return list(await asyncio.gather(*[_limited(tc) for tc in tool_calls]))
+
+    def _tool_cache_key(self, tool: ToolType, params: dict) -> tuple[str, str] | None:
+        if not tool._meta.cacheable:
+            return None
+        try:
+            return (tool._meta.name, json.dumps(params, sort_keys=True))
+        except TypeError:
+            return None
+
+    def _get_cached_observation(self, key: tuple[str, str] | None) -> str | None:
+        if key is None:
+            return None
+        with self._tool_cache_lock:
+            observation = self._tool_cache.get(key)
+            if observation is not None:
+                self._tool_cache.move_to_end(key)
+            return observation
+
+    def _cache_observation(self, key: tuple[str, str] | None, observation: str) -> None:
+        if key is None:
+            return
+        with self._tool_cache_lock:
+            self._tool_cache[key] = observation
+            self._tool_cache.move_to_end(key)
+            if len(self._tool_cache) > self._tool_cache_max:
+                self._tool_cache.popitem(last=False)
 
     def _call_tool(self, tool_name: str, params: dict) -> str:
-        with self.tracer.start_as_current_span("call_tool") as span:
+        with self._detail_span("call_tool") as span:
             span.set_attribute("tool.name", tool_name)
             span.set_attribute("params", str(params))
 
@@ -162,11 +352,22 @@ class AgentBase(ABC):
             tool = self.tools[tool_name]
             span.set_attribute("tool.description", tool._meta.description)
 
+            cache_key = self._tool_cache_key(tool, params)
+            observation = self._get_cached_observation(cache_key)
+            span.set_attribute("cache.hit", observation is not None)
+            if observation is not None:
+                return observation
+
             try:
-                result = tool(**params)
-                span.set_attribute("result.length", len(str(result)))
-                span.set_attribute("result", str(result))
-                return f"Observation: {result}"
+                result = tool.call(**params)
+                result_str = result if isinstance(result, str) else str(result)
+                span.set_attribute("result.length", len(result_str))
+                # Cap the attribute so large observations don't bloat span exports.
+                span.set_attribute("result", result_str[:_MAX_RESULT_ATTR_LENGTH])
+                observation = f"Observation: {result_str}"
+                if tool.is_cacheable_result(result):
+                    self._cache_observation(cache_key, observation)
+                return observation
             except Exception as e:
                 error_msg = f"Error executing tool '{tool_name}': {str(e)}"
                 span.set_status(Status(StatusCode.ERROR, error_msg))
@@ -174,7 +375,7 @@ class AgentBase(ABC):
                 return f"Error executing tool '{tool_name}': {str(e)}"
 
     async def _call_tool_async(self, tool_name: str, params: dict) -> str:
-        with self.tracer.start_as_current_span("call_tool_async") as span:
+        with self._detail_span("call_tool_async") as span:
             span.set_attribute("tool.name", tool_name)
             span.set_attribute("params", str(params))
 
@@ -186,10 +387,21 @@ class AgentBase(ABC):
             tool = self.tools[tool_name]
             span.set_attribute("tool.description", tool._meta.description)
 
+            cache_key = self._tool_cache_key(tool, params)
+            observation = self._get_cached_observation(cache_key)
+            span.set_attribute("cache.hit", observation is not None)
+            if observation is not None:
+                return observation
+
             try:
                 result = await tool.execute_async(**params)
-                span.set_attribute("result.length", len(str(result)))
-                return f"Observation: {result}"
+                result_str = result if isinstance(result, str) else str(result)
+                span.set_attribute("result.length", len(result_str))
+                span.set_attribute("result", result_str[:_MAX_RESULT_ATTR_LENGTH])
+                observation = f"Observation: {result_str}"
+                if tool.is_cacheable_result(result):
+                    self._cache_observation(cache_key, observation)
+                return observation
             except Exception as e:
                 error_msg = f"Error executing tool '{tool_name}': {str(e)}"
                 span.set_status(Status(StatusCode.ERROR, error_msg))
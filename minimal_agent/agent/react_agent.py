@@ -1,9 +1,8 @@
-import asyncio
-from datetime import datetime
-import re
-from .base import AgentBase
+import time
+from collections import deque
+from .base import AgentBase, AgentConfig
 from minimal_agent.llm.base import LLMProviderType
-from minimal_agent.memory.base import MemoryType
+from minimal_agent.memory.base import MemoryEntry, MemoryType
 from minimal_agent.tools.base import ToolType
 from minimal_agent.message import Message
 
@@ -13,18 +12,73 @@ from opentelemetry.trace.status import Status, StatusCode
 
 
 class ReActAgent(AgentBase):
+    # Number of most recent memory entries sent to the LLM each step.
+    MESSAGE_WINDOW = 10
+
     def __init__(
         self,
         llm_provider: LLMProviderType,
         tools: list[ToolType] | None = None,
         memory: MemoryType | None = None,
+        config: AgentConfig | None = None,
     ) -> None:
-        super().__init__(llm_provider, tools, memory)
+        super().__init__(llm_provider, tools, memory, config)
         self.mode = "REACT"
         # Get tracer for this class
         self.tracer = trace.get_tracer("minimal_agent.agents.react")
+        # Sent as the provider's static_system on every turn. It must stay
+        # byte-identical between turns so the LLM prompt-prefix cache keeps
+        # hitting; per-turn context belongs in the trailing messages instead.
+        self._system_prompt_cache = self._create_react_prompt()
+        # Rolling view of the newest non-system memory entries as messages. It is
+        # rebuilt from memory once per run by reset() and kept in step by _append()
+        # in between, so nothing is rebuilt per iteration.
+        self._message_cache: deque[Message] = self._load_message_window()
+
+    def reset(self) -> None:
+        super().reset()
+        # Memory may have been cleared or added to outside the agent since the
+        # window was last built.
+        self._message_cache = self._load_message_window()
+
+    def _load_message_window(self) -> deque[Message]:
+        return deque(
+            (
+                message
+                for message in self._format_messages_from_memory(self.MESSAGE_WINDOW)
+                if message.role != "system"
+            ),
+            maxlen=self.MESSAGE_WINDOW,
+        )
+
+    def _append(self, entry: MemoryEntry) -> None:
+        self.memory.add(entry)
+        if entry.role == "system":
+            # Sent separately as static_system, never as part of the window.
+            return
+        if entry.role == "observation":
+            self._shorten_old_observations(entry.metadata.get("step"))
+        self._message_cache.append(self._entry_to_message(entry))
+
+    def _shorten_old_observations(self, step: int | None) -> None:
+        # Observations are the only cached messages tagged with a tool.
+        for i, message in enumerate(self._message_cache):
+            metadata = message.metadata or {}
+            if "tool" in metadata and metadata.get("step") != step:
+                self._message_cache[i] = self._shorten_message(message)
+
+    def add_tool(self, tool: ToolType) -> None:
+        super().add_tool(tool)
+        self._system_prompt_cache = self._create_react_prompt()
 
     def _create_react_prompt(self) -> str:
+        if self.config.tool_concurrency_limit > 1:
+            tool_rule = (
+                "- You may use several independent tools at once by repeating the "
+                "Action/Action Input pair; they run concurrently."
+            )
+        else:
+            tool_rule = "- If using a tool, only one tool at a time."
         return (
 f"""
 # Task
@@ -58,7 +112,7 @@ You can use the following tools:
 # Important Rules
 
 - ALWAYS follow the Thought/Action/Observation/Answer format
-- If using a tool, only one tool at a time.
+{tool_rule}
 - NEVER make up tool results
 - If a tool fails, try a different approach
 - Be thorough and detailed in your reasoning
@@ -85,53 +139,43 @@ Make sure to use proper Markdown syntax for headings, lists, and the hyperlink i
             self.reset()
             self.state["input"] = input_text
 
-            with self.tracer.start_as_current_span("create_system_prompt"):
-                system_prompt = self._create_react_prompt()
+            self._append(MemoryEntry("system", self._system_prompt_cache, time.time()))
 
-            self.memory.add(
-                {
-                    "role": "system",
-                    "content": system_prompt,
-                    "timestamp": datetime.now().timestamp(),
-                    "metadata": {},
-                }
-            )
+            self._append(MemoryEntry("user", input_text, time.time()))
 
-            self.memory.add(
-                {
-                    "role": "user",
-                    "content": input_text,
-                    "timestamp": datetime.now().timestamp(),
-                    "metadata": {},
-                }
-            )
+            # Bind hot attributes to locals once instead of on every iteration.
+            append = self._append
+            tracer = self.tracer
+            config = self.config
+            state = self.state
 
             iterations = 0
-            while iterations < self.config.max_iterations and not self.state.get(
+            while iterations < config.max_iterations and not state.get(
                 "is_complete", False
             ):
                 iterations += 1
-                self.state["current_step"] = iterations
+                state["current_step"] = iterations
 
                 # Create a span for each iteration
-                with self.tracer.start_as_current_span(
+                with tracer.start_as_current_span(
                     f"iteration_{iterations}"
                 ) as iteration_span:
                     iteration_span.set_attribute("iteration.number", iterations)
 
-                    with self.tracer.start_as_current_span("format_messages"):
-                        messages = self._format_messages_from_memory()
+                    messages = list(self._message_cache)
+                    iteration_span.set_attribute("messages.count", len(messages))
 
-                    with self.tracer.start_as_current_span(
+                    with tracer.start_as_current_span(
                         "llm_completion"
                     ) as llm_span:
-                        llm_span.set_attribute("temperature", self.config.temperature)
-                        llm_span.set_attribute("max_tokens", self.config.max_tokens)
+                        llm_span.set_attribute("temperature", config.temperature)
+                        llm_span.set_attribute("max_tokens", config.max_tokens)
 
                         response = self._llm.completion(
                             messages=messages,
-                            temperature=self.config.temperature,
-                            max_tokens=self.config.max_tokens,
+                            temperature=config.temperature,
+                            max_tokens=config.max_tokens,
+                            static_system=self._system_prompt_cache,
                         )
 
                         assistant_message = response.content
@@ -139,67 +183,62 @@ Make sure to use proper Markdown syntax for headings, lists, and the hyperlink i
                             "response_length", len(assistant_message)
                         )
 
-                    self.memory.add(
-                        {
-                            "role": "assistant",
-                            "content": assistant_message,
-                            "timestamp": datetime.now().timestamp(),
-                            "metadata": {"step": iterations},
-                        }
+                    append(
+                        MemoryEntry(
+                            "assistant",
+                            assistant_message,
+                            time.time(),
+                            {"step": iterations},
+                        )
                     )
 
-                    if "Answer:" in assistant_message and 'Action:' not in assistant_message:
-                        with self.tracer.start_as_current_span("extract_answer"):
-                            answer_match = re.search(
-                                r"Answer:\s*(.*?)(?:$|Thought:)",
-                                assistant_message,
-                                re.DOTALL,
-                            )
-                            if answer_match:
-                                self.state["response"] = answer_match.group(1).strip()
-                                self.state["is_complete"] = True
-                                iteration_span.set_attribute("found_answer", True)
-                                break
+                    parsed = self._parse_response(assistant_message)
+                    if parsed.answer is not None:
+                        state["response"] = parsed.answer
+                        state["is_complete"] = True
+                        iteration_span.set_attribute("found_answer", True)
+                        break
 
-                    with self.tracer.start_as_current_span("parse_tool_call"):
-                        tool_call = self._parse_tool_call(assistant_message)
+                    tool_calls = parsed.tool_calls
+                    if config.tool_concurrency_limit <= 1:
+                        tool_calls = tool_calls[:1]
+                    iteration_span.set_attribute("tool_calls.count", len(tool_calls))
 
-                    if tool_call:
-                        with self.tracer.start_as_current_span(
+                    if tool_calls:
+                        with tracer.start_as_current_span(
                             "tool_execution"
                         ) as tool_span:
-                            tool_span.set_attribute("tool.name", tool_call["tool"])
                             tool_span.set_attribute(
-                                "tool.params", str(tool_call["params"])
-                            )
-
-                            observation = self._call_tool(
-                                tool_call["tool"], tool_call["params"]
+                                "tool.names", [tc["tool"] for tc in tool_calls]
                             )
                             tool_span.set_attribute(
-                                "observation_length", len(observation)
+                                "tool.params", [str(tc["params"]) for tc in tool_calls]
                             )
 
-                            self.memory.add(
-                                {
-                                    "role": "observation",
-                                    "content": observation,
-                                    "timestamp": datetime.now().timestamp(),
-                                    "metadata": {
-                                        "step": iterations,
-                                        "tool": tool_call["tool"],
-                                    },
-                                }
+                            observations = self._call_tools(tool_calls)
+                            tool_span.set_attribute(
+                                "observation_length",
+                                sum(len(observation) for observation in observations),
                             )
+
+                            for tool_call, observation in zip(tool_calls, observations):
+                                append(
+                                    MemoryEntry(
+                                        "observation",
+                                        observation,
+                                        time.time(),
+                                        {"step": iterations, "tool": tool_call["tool"]},
+                                    )
+                                )
                     else:
-                        if iterations >= self.config.max_iterations:
+                        if iterations >= config.max_iterations:
                             iteration_span.set_status(
                                 Status(StatusCode.ERROR, "Max iterations reached")
                             )
-                            self.state["response"] = (
+                            state["response"] = (
                                 "I'm sorry, I couldn't complete the task within the allowed iterations."
                             )
-                            self.state["is_complete"] = True
+                            state["is_complete"] = True
                             break
 
             # Set span status based on completion
@@ -224,132 +263,106 @@ Make sure to use proper Markdown syntax for headings, lists, and the hyperlink i
             self.reset()
             self.state["input"] = input_text
 
-            with self.tracer.start_as_current_span("create_system_prompt"):
-                system_prompt = self._create_react_prompt()
+            self._append(MemoryEntry("system", self._system_prompt_cache, time.time()))
 
-            self.memory.add(
-                {
-                    "role": "system",
-                    "content": system_prompt,
-                    "timestamp": datetime.now().timestamp(),
-                    "metadata": {},
-                }
-            )
+            self._append(MemoryEntry("user", input_text, time.time()))
 
-            self.memory.add(
-                {
-                    "role": "user",
-                    "content": input_text,
-                    "timestamp": datetime.now().timestamp(),
-                    "metadata": {},
-                }
-            )
+            # Bind hot attributes to locals once instead of on every iteration.
+            append = self._append
+            tracer = self.tracer
+            config = self.config
+            state = self.state
 
             iterations = 0
-            while iterations < self.config.max_iterations and not self.state.get(
+            while iterations < config.max_iterations and not state.get(
                 "is_complete", False
             ):
                 iterations += 1
-                self.state["current_step"] = iterations
+                state["current_step"] = iterations
 
                 # Create a span for each iteration
-                with self.tracer.start_as_current_span(
+                with tracer.start_as_current_span(
                     f"iteration_{iterations}"
                 ) as iteration_span:
                     iteration_span.set_attribute("iteration.number", iterations)
 
-                    with self.tracer.start_as_current_span("format_messages"):
-                        messages = self._format_messages_from_memory()
+                    messages = list(self._message_cache)
+                    iteration_span.set_attribute("messages.count", len(messages))
 
-                    with self.tracer.start_as_current_span(
+                    with tracer.start_as_current_span(
                         "llm_completion_async"
                     ) as llm_span:
-                        llm_span.set_attribute("temperature", self.config.temperature)
-                        llm_span.set_attribute("max_tokens", self.config.max_tokens)
-
-                        if hasattr(self.llm_client, "create_chat_completion_async"):
-                            response = (
-                                await self.llm_client.create_chat_completion_async(
-                                    messages=messages,
-                                    temperature=self.config.temperature,
-                                    max_tokens=self.config.max_tokens,
-                                )
-                            )
-                            assistant_message = response.content
-                        else:
-                            response = await asyncio.to_thread(
-                                self._llm.completion,
-                                messages=messages,
-                                temperature=self.config.temperature,
-                                max_tokens=self.config.max_tokens,
-                            )
-                            assistant_message = response.content
+                        llm_span.set_attribute("temperature", config.temperature)
+                        llm_span.set_attribute("max_tokens", config.max_tokens)
+
+                        response = await self._llm.completion_async(
+                            messages=messages,
+                            temperature=config.temperature,
+                            max_tokens=config.max_tokens,
+                            static_system=self._system_prompt_cache,
+                        )
+                        assistant_message = response.content
 
                         llm_span.set_attribute(
                             "response_length", len(assistant_message)
                         )
 
-                    self.memory.add(
-                        {
-                            "role": "assistant",
-                            "content": assistant_message,
-                            "timestamp": datetime.now().timestamp(),
-                            "metadata": {"step": iterations},
-                        }
+                    append(
+                        MemoryEntry(
+                            "assistant",
+                            assistant_message,
+                            time.time(),
+                            {"step": iterations},
+                        )
                     )
 
-                    if "Answer:" in assistant_message:
-                        with self.tracer.start_as_current_span("extract_answer"):
-                            answer_match = re.search(
-                                r"Answer:\s*(.*?)(?:$|Thought:)",
-                                assistant_message,
-                                re.DOTALL,
-                            )
-                            if answer_match:
-                                self.state["response"] = answer_match.group(1).strip()
-                                self.state["is_complete"] = True
-                                iteration_span.set_attribute("found_answer", True)
-                                break
+                    parsed = self._parse_response(assistant_message)
+                    if parsed.answer is not None:
+                        state["response"] = parsed.answer
+                        state["is_complete"] = True
+                        iteration_span.set_attribute("found_answer", True)
+                        break
 
-                    with self.tracer.start_as_current_span("parse_tool_call"):
-                        tool_call = self._parse_tool_call(assistant_message)
+                    tool_calls = parsed.tool_calls
+                    if config.tool_concurrency_limit <= 1:
+                        tool_calls = tool_calls[:1]
+                    iteration_span.set_attribute("tool_calls.count", len(tool_calls))
 
-                    if tool_call:
-                        with self.tracer.start_as_current_span(
+                    if tool_calls:
+                        with tracer.start_as_current_span(
                             "tool_execution_async"
                         ) as tool_span:
-                            tool_span.set_attribute("tool.name", tool_call["tool"])
                             tool_span.set_attribute(
-                                "tool.params", str(tool_call["params"])
-                            )
-
-                            observation = await self._call_tool_async(
-                                tool_call["tool"], tool_call["params"]
+                                "tool.names", [tc["tool"] for tc in tool_calls]
                             )
                             tool_span.set_attribute(
-                                "observation_length", len(observation)
+                                "tool.params", [str(tc["params"]) for tc in tool_calls]
                             )
 
-                            self.memory.add(
-                                {
-                                    "role": "observation",
-                                    "content": observation,
-                                    "timestamp": datetime.now().timestamp(),
-                                    "metadata": {
-                                        "step": iterations,
-                                        "tool": tool_call["tool"],
-                                    },
-                                }
+                            observations = await self._call_tools_async(tool_calls)
+                            tool_span.set_attribute(
+                                "observation_length",
+                                sum(len(observation) for observation in observations),
                             )
+
+                            for tool_call, observation in zip(tool_calls, observations):
+                                append(
+                                    MemoryEntry(
+                                        "observation",
+                                        observation,
+                                        time.time(),
+                                        {"step": iterations, "tool": tool_call["tool"]},
+                                    )
+                                )
                     else:
-                        if iterations >= self.config.max_iterations:
+                        if iterations >= config.max_iterations:
                             iteration_span.set_status(
                                 Status(StatusCode.ERROR, "Max iterations reached")
                             )
-                            self.state["response"] = (
+                            state["response"] = (
                                 "I'm sorry, I couldn't complete the task within the allowed iterations."
                             )
-                            self.state["is_complete"] = True
+                            state["is_complete"] = True
                             break
 
             # Set span status based on completion
@@ -0,0 +1,178 @@
+import asyncio
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+
+from agent.base import AgentConfig
+from agent.react_agent import ReActAgent
+from minimal_agent.llm.base import LLMProvider
+from minimal_agent.memory.base import ListMemory
+from minimal_agent.message import Message
+from minimal_agent.tools.base import Tools
+from minimal_agent.tools.types import Arg
+
+
+class FakeLLM(LLMProvider):
+    def __init__(self) -> None:
+        super().__init__("fake")
+        self.seen: list[list[str]] = []
+
+    def completion(self, messages, **kwargs) -> Message:
+        self.seen.append([message.content for message in messages])
+        return Message(role="assistant", content="Answer: done")
+
+    async def completion_async(self, messages, **kwargs) -> Message:
+        return self.completion(messages, **kwargs)
+
+
+def _search_tool(results):
+    calls = []
+
+    def search(query: str):
+        calls.append(query)
+        return results.pop(0)
+
+    tool = Tools(
+        name="search",
+        description="Search.",
+        args=[Arg(arg_name="query", arg_desc="", arg_type="str")],
+        func=search,
+    )
+    return tool, calls
+
+
+def test_error_results_are_not_cached() -> None:
+    tool, calls = _search_tool(
+        [
+            [{"error": "Search request failed: down"}],
+            [{"title": "t", "url": "u"}],
+            [{"title": "other", "url": "v"}],
+        ]
+    )
+    agent = ReActAgent(FakeLLM(), tools=[tool])
+
+    first = agent._call_tool("search", {"query": "q"})
+    second = agent._call_tool("search", {"query": "q"})
+    third = agent._call_tool("search", {"query": "q"})
+
+    assert "Search request failed" in first
+    assert "'title': 't'" in second
+    assert third == second
+    assert calls == ["q", "q"]
+
+
+def test_error_results_are_not_cached_async() -> None:
+    tool, calls = _search_tool([{"error": "down"}, "ok"])
+    agent = ReActAgent(FakeLLM(), tools=[tool])
+
+    first = asyncio.run(agent._call_tool_async("search", {"query": "q"}))
+    second = asyncio.run(agent._call_tool_async("search", {"query": "q"}))
+
+    assert "down" in first
+    assert second == "Observation: ok"
+    assert calls == ["q", "q"]
+
+
+def test_message_window_follows_memory_between_runs() -> None:
+    llm = FakeLLM()
+    agent = ReActAgent(llm)
+
+    agent.run("first question")
+    agent.memory.clear()
+    agent.run("second question")
+
+    assert llm.seen[-1] == ["second question"]
+
+
+def test_empty_memory_is_kept() -> None:
+    memory = ListMemory()
+    agent = ReActAgent(FakeLLM(), memory=memory)
+
+    assert agent.memory is memory
+
+
+def _parse(content: str):
+    return ReActAgent(FakeLLM())._parse_response(content)
+
+
+def test_parse_nested_json_params() -> None:
+    parsed = _parse(
+        'Thought: look it up\nAction: search\n'
+        'Action Input: {"query": {"terms": ["a", {"b": 2}]}, "limit": 3}'
+    )
+
+    assert parsed.answer is None
+    assert parsed.tool_calls == [
+        {"tool": "search", "params": {"query": {"terms": ["a", {"b": 2}]}, "limit": 3}}
+    ]
+
+
+def test_parse_json_params_followed_by_text() -> None:
+    parsed = _parse(
+        'Action: search\nAction Input: {"query": "a}b"}\nI will wait for the result.'
+    )
+
+    assert parsed.tool_calls == [{"tool": "search", "params": {"query": "a}b"}}]
+
+
+def test_parse_two_action_blocks() -> None:
+    parsed = _parse(
+        'Thought: both\nAction: search\nAction Input: {"query": "x"}\n'
+        'Action: add\nAction Input: {"a": 1, "b": 2}'
+    )
+
+    assert parsed.tool_calls == [
+        {"tool": "search", "params": {"query": "x"}},
+        {"tool": "add", "params": {"a": 1, "b": 2}},
+    ]
+
+
+def test_parse_answer_stops_at_next_thought() -> None:
+    parsed = _parse("Thought: done\nAnswer:  42 \nThought: anything else?")
+
+    assert parsed.answer == "42"
+    assert parsed.tool_calls == []
+
+
+def test_parse_answer_with_action_does_not_finish() -> None:
+    parsed = _parse(
+        'Thought: guess\nAction: search\nAction Input: {"query": "x"}\nAnswer: maybe'
+    )
+
+    assert parsed.answer is None
+    assert parsed.tool_calls == [{"tool": "search", "params": {"query": "x"}}]
+
+
+def test_parse_executor_code_block() -> None:
+    parsed = _parse(
+        "Action: python_executor\nAction Input: ```python\nprint({'a': 1})\n```"
+    )
+
+    assert parsed.tool_calls == [
+        {"tool": "python_executor", "params": {"code": "print({'a': 1})\n"}}
+    ]
+
+
+def test_parse_non_json_params_fall_back_to_lines() -> None:
+    parsed = _parse("Action: search\nAction Input: {\nquery: hello world\nlimit: 3\n}")
+
+    assert parsed.tool_calls == [
+        {"tool": "search", "params": {"query": "hello world", "limit": "3"}}
+    ]
+
+
+def test_parse_status_flags_only_responses_without_answer_or_action() -> None:
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    agent = ReActAgent(FakeLLM(), config=AgentConfig(detailed_tracing=True))
+    agent.tracer = provider.get_tracer(__name__)
+
+    agent._parse_response("Thought: done\nAnswer: 42")
+    agent._parse_response("Thought: hmm, not sure")
+
+    answered, empty = exporter.get_finished_spans()
+    assert answered.status.status_code is StatusCode.UNSET
+    assert empty.status.status_code is StatusCode.ERROR
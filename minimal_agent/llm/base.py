@@ -1,6 +1,7 @@
 from typing import Any, Literal, TypeVar
 from pydantic import BaseModel
 from abc import ABC, abstractmethod
+from minimal_agent.llm.cache import LLMCache
 from minimal_agent.message import Message
 
 LLMProviderType = TypeVar('LLMProviderType', bound='LLMProvider')
@@ -10,12 +11,44 @@ class CompletionsOptions(BaseModel):
 
 
 class LLMProvider(ABC):
+    """Base class for chat completion providers.
+
+    ``static_system`` is sent as the first message of every request. Callers
+    should pass the same string on every turn and keep anything that changes
+    per turn (retrieved memory, search hits) in the trailing messages, e.g. a
+    ``Message(role="user", content="[context]\n...")`` placed before the latest
+    user turn. The request prefix then stays byte-identical across turns and
+    the server-side prompt cache keeps hitting.
+    """
 
     def __init__(
         self,
         model_name: str,
+        cache: LLMCache | None = None,
     ) -> None:
         self.model_name = model_name
+        self.cache = cache
+        self._static_system: Message | None = None
+
+    async def aclose(self) -> None:
+        """Release resources held for async calls on the running event loop."""
+
+    async def __aenter__(self) -> "LLMProvider":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def _with_static_system(
+        self, messages: list[Message], static_system: str | None
+    ) -> list[Message]:
+        if static_system is None:
+            return messages
+        # Reuse one Message while the prompt is unchanged, so its id (and the
+        # per-id encodings providers cache) stay stable across turns.
+        if self._static_system is None or self._static_system.content != static_system:
+            self._static_system = Message(role="system", content=static_system)
+        return [self._static_system, *messages]
 
     @abstractmethod
     def completion(
@@ -26,6 +59,7 @@ class LLMProvider(ABC):
         top_p: float = 0.9,
         stop: list[str] | str | None = None,
         response_format: Literal['text', 'json'] = "text",
+        static_system: str | None = None,
         **kwargs: dict[str, Any],
     ) -> Message:
         pass
@@ -39,6 +73,7 @@ class LLMProvider(ABC):
         top_p: float = 0.9,
         stop: list[str] | None = None,
         response_format: Literal['text', 'json'] = "text",
+        static_system: str | None = None,
         **kwargs: dict[str, Any],
     ) -> Message:
         pass
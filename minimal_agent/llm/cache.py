@@ -0,0 +1,192 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Sequence
+from typing import NamedTuple
+
+import numpy as np
+
+from minimal_agent import _json
+from minimal_agent.message import Message
+
+EmbedFunc = Callable[[str], Sequence[float]]
+
+
+class _CacheEntry(NamedTuple):
+    message: Message
+    expires_at: float
+    semantic_bucket: Hashable | None = None
+
+
+class _SemanticIndex:
+    """Unit-normalized embeddings of one semantic bucket, one row per exact key.
+
+    Rows live in preallocated arrays that double when full, so adding a row is
+    amortized O(1); removing one moves the last row into its place.
+    """
+
+    def __init__(self, dim: int) -> None:
+        self._vectors = np.empty((8, dim), dtype=np.float32)
+        self._expires = np.empty(8, dtype=np.float64)
+        self._keys: list[Hashable] = []
+        self._rows: dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: Hashable, vector: np.ndarray, expires_at: float) -> None:
+        row = len(self._keys)
+        if row == len(self._expires):
+            self._vectors = np.concatenate([self._vectors, np.empty_like(self._vectors)])
+            self._expires = np.concatenate([self._expires, np.empty_like(self._expires)])
+        self._vectors[row] = vector
+        self._expires[row] = expires_at
+        self._keys.append(key)
+        self._rows[key] = row
+
+    def remove(self, key: Hashable) -> None:
+        row = self._rows.pop(key)
+        last = len(self._keys) - 1
+        last_key = self._keys.pop()
+        if row != last:
+            self._vectors[row] = self._vectors[last]
+            self._expires[row] = self._expires[last]
+            self._keys[row] = last_key
+            self._rows[last_key] = row
+
+    def expired(self, now: float) -> list[Hashable]:
+        rows = np.flatnonzero(self._expires[: len(self._keys)] < now)
+        return [self._keys[row] for row in rows]
+
+    def best(self, query: np.ndarray, now: float) -> tuple[Hashable, float] | None:
+        size = len(self._keys)
+        scores = self._vectors[:size] @ query
+        # Expired rows must not hide a live second-best match.
+        scores[self._expires[:size] < now] = -np.inf
+        row = int(np.argmax(scores))
+        if scores[row] == -np.inf:
+            return None
+        return self._keys[row], float(scores[row])
+
+
+class LLMCache:
+    """Completion cache: exact SHA-256 match first, then optional cosine similarity.
+
+    Entries are bucketed by sampling parameters, so answers are only reused
+    for identical settings. Pass ``embed`` (e.g. a local sentence-transformers
+    model) to enable the semantic lookup.
+
+    The exact key covers the whole prompt. The semantic lookup embeds only the
+    last ``semantic_turns`` non-system messages and is additionally bucketed by
+    the system messages: a long shared system prompt would otherwise fill the
+    embedder's input window and make every prompt look alike.
+
+    ``max_entries`` caps the whole cache; evicting an exact entry also drops its
+    semantic row.
+    """
+
+    def __init__(
+        self,
+        embed: EmbedFunc | None = None,
+        threshold: float = 0.92,
+        ttl: float | None = 3600.0,
+        max_entries: int = 1024,
+        semantic_turns: int = 4,
+    ) -> None:
+        self._embed = embed
+        self._threshold = threshold
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._semantic_turns = semantic_turns
+        self._exact: OrderedDict[tuple[Hashable, str], _CacheEntry] = OrderedDict()
+        self._semantic: dict[Hashable, _SemanticIndex] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def serialize(messages: list[Message]) -> bytes:
+        return _json.dumps([[message.role, message.content] for message in messages])
+
+    def _semantic_key(
+        self, bucket: Hashable, messages: list[Message]
+    ) -> tuple[tuple[Hashable, str], str]:
+        system = [message for message in messages if message.role == "system"]
+        tail = [message for message in messages if message.role != "system"]
+        system_digest = hashlib.sha256(self.serialize(system)).hexdigest()
+        text = self.serialize(tail[-self._semantic_turns :]).decode()
+        return (bucket, system_digest), text
+
+    def get(self, bucket: Hashable, messages: list[Message]) -> Message | None:
+        prompt = self.serialize(messages)
+        key = (bucket, hashlib.sha256(prompt).hexdigest())
+        now = time.time()
+
+        with self._lock:
+            entry = self._exact.get(key)
+            if entry is not None:
+                if entry.expires_at >= now:
+                    self._exact.move_to_end(key)
+                    return entry.message
+                self._remove(key)
+
+        if self._embed is None:
+            return None
+
+        semantic_bucket, text = self._semantic_key(bucket, messages)
+        query = self._normalize(self._embed(text))
+        with self._lock:
+            index = self._semantic.get(semantic_bucket)
+            match = index.best(query, now) if index is not None else None
+            if match is None or match[1] < self._threshold:
+                return None
+            self._exact.move_to_end(match[0])
+            return self._exact[match[0]].message
+
+    def put(self, bucket: Hashable, messages: list[Message], message: Message) -> None:
+        prompt = self.serialize(messages)
+        key = (bucket, hashlib.sha256(prompt).hexdigest())
+        now = time.time()
+        expires_at = now + self._ttl if self._ttl is not None else float("inf")
+        semantic_bucket = vector = None
+        if self._embed is not None:
+            semantic_bucket, text = self._semantic_key(bucket, messages)
+            vector = self._normalize(self._embed(text))
+
+        with self._lock:
+            if key in self._exact:
+                self._remove(key)
+            self._exact[key] = _CacheEntry(message, expires_at, semantic_bucket)
+
+            if vector is not None:
+                index = self._semantic.get(semantic_bucket)
+                if index is not None:
+                    for expired in index.expired(now):
+                        self._remove(expired)
+                # Pruning drops the bucket if it empties it, so look it up again.
+                index = self._semantic.get(semantic_bucket)
+                if index is None:
+                    index = self._semantic[semantic_bucket] = _SemanticIndex(len(vector))
+                index.add(key, vector, expires_at)
+
+            while len(self._exact) > self._max_entries:
+                self._remove(next(iter(self._exact)))
+
+    def _remove(self, key: tuple[Hashable, str]) -> None:
+        entry = self._exact.pop(key)
+        if entry.semantic_bucket is None:
+            return
+        index = self._semantic[entry.semantic_bucket]
+        index.remove(key)
+        if not index:
+            del self._semantic[entry.semantic_bucket]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exact.clear()
+            self._semantic.clear()
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
@@ -1,26 +1,51 @@
-import json
+import asyncio
+import contextlib
+import io
+from collections.abc import AsyncGenerator, Generator
+from http import HTTPStatus
 from typing import Any, Literal
 
+import aiohttp
 import dashscope
+from minimal_agent import _json
 from minimal_agent.llm.base import LLMProvider
-from dashscope.api_entities.dashscope_response import (
-    Message as DashScopeMsg,
-)
+from minimal_agent.llm.cache import LLMCache
 from minimal_agent.message import Message, MessageTypeEnum
 from opentelemetry import trace
+from opentelemetry.trace import Status, StatusCode
 
 QwenModelLiteral = Literal["qwen-max", "qwen-plus"]
 
+DASHSCOPE_GENERATION_URL = (
+    "https://dashscope.aliyuncs.com/api/v1/services/aigc/text-generation/generation"
+)
+_MAX_ATTEMPTS = 3
+# response_format -> (DashScope response_format type, Message.message_type)
+_FMT_MAP: dict[str, tuple[str, MessageTypeEnum]] = {
+    "text": ("text", MessageTypeEnum.TEXT),
+    "json": ("json_object", MessageTypeEnum.JSON),
+}
+_MAX_ENCODED_MESSAGES = 1024
+
 
 class Qwen(LLMProvider):
     def __init__(
         self,
         access_key: str,
         model_name: str,
+        cache: LLMCache | None = None,
+        batch_window: float = 0.0,
     ) -> None:
-        super().__init__(model_name)
+        super().__init__(model_name, cache)
         self.__access_key = access_key
         self.tracer = trace.get_tracer("minimal_agent.llm.qwen")
+        self._batch_window = batch_window
+        # Message.id -> JSON bytes, so the chat prefix isn't re-serialized every turn.
+        self._encoded_messages: dict[str, bytes] = {}
+        # Message.id -> request dict, reused across turns for the same reason.
+        self._request_messages: dict[str, dict[str, str]] = {}
+        # Async resources are bound to the loop that created them; see _loop_state().
+        self._loop_states: dict[asyncio.AbstractEventLoop, _LoopState] = {}
 
     def completion(
         self,
@@ -30,11 +55,12 @@ class Qwen(LLMProvider):
         top_p: float = 0.9,
         stop: list[str] | str | None = None,
         response_format: Literal["text", "json"] = "text",
+        static_system: str | None = None,
         **kwargs: dict[str, Any],
     ) -> Message:
-        input = [
-            DashScopeMsg(role=item.role, content=item.content) for item in messages
-        ]
+        messages = self._with_static_system(messages, static_system)
+        api_format, message_type = _FMT_MAP[response_format]
+        input = self._to_request_messages(messages)
         with self.tracer.start_as_current_span("qwen.completion") as span:
             span.set_attribute("model_name", self.model_name)
             span.set_attribute("messages.count", len(messages))
@@ -43,7 +69,18 @@ class Qwen(LLMProvider):
             span.set_attribute("top_p", top_p)
             span.set_attribute("stop", stop)
             span.set_attribute("response_format", response_format)
-            span.set_attribute("input", json.dumps(input))
+            if span.is_recording():
+                span.set_attribute("input", self._encode_input(messages))
+
+            cache_bucket = self._cache_bucket(
+                temperature, top_p, max_tokens, stop, response_format
+            )
+            if self.cache is not None and not kwargs:
+                cached = self.cache.get(cache_bucket, messages)
+                span.set_attribute("cache.hit", cached is not None)
+                if cached is not None:
+                    return cached
+
             response = dashscope.Generation.call(
                 api_key=self.__access_key,
                 model=self.model_name,
@@ -53,29 +90,397 @@ class Qwen(LLMProvider):
                 max_tokens=max_tokens,
                 stop=stop,
                 response_format={
-                    "type": "json_object" if response_format == "json" else response_format
+                    "type": api_format
                 },
                 **kwargs,
             )
 
             span.set_attribute("response", response.output.text)
-            return Message(
+            message = Message(
                 role="assistant",
                 content=response.output.text,
-                message_type=MessageTypeEnum(response_format),
+                message_type=message_type,
                 metadata={
                     'model': self.model_name,
                 }
             )
+            if self.cache is not None and not kwargs:
+                self.cache.put(cache_bucket, messages, message)
+            return message
+
+    def completion_stream(
+        self,
+        messages: list[Message],
+        temperature: float = 0.7,
+        max_tokens: int | None = None,
+        top_p: float = 0.9,
+        stop: list[str] | str | None = None,
+        response_format: Literal["text", "json"] = "text",
+        static_system: str | None = None,
+        **kwargs: dict[str, Any],
+    ) -> Generator[str, None, Message]:
+        """Like completion, but yields text deltas as they arrive and returns the full Message."""
+        messages = self._with_static_system(messages, static_system)
+        api_format, message_type = _FMT_MAP[response_format]
+        input = self._to_request_messages(messages)
+        # The span outlives each yield, so it is not made current: attaching it
+        # would leak into the consumer's context between chunks.
+        span = self.tracer.start_span("qwen.completion_stream")
+        try:
+            span.set_attribute("model_name", self.model_name)
+            span.set_attribute("messages.count", len(messages))
+            span.set_attribute("temperature", temperature)
+            span.set_attribute("response_format", response_format)
+            if span.is_recording():
+                span.set_attribute("input", self._encode_input(messages))
+
+            cache_bucket = self._cache_bucket(
+                temperature, top_p, max_tokens, stop, response_format
+            )
+            if self.cache is not None and not kwargs:
+                cached = self.cache.get(cache_bucket, messages)
+                span.set_attribute("cache.hit", cached is not None)
+                if cached is not None:
+                    yield cached.content
+                    return cached
+
+            responses = dashscope.Generation.call(
+                api_key=self.__access_key,
+                model=self.model_name,
+                messages=input,
+                temperature=temperature,
+                top_p=top_p,
+                max_tokens=max_tokens,
+                stop=stop,
+                response_format={
+                    "type": api_format
+                },
+                stream=True,
+                incremental_output=True,
+                **kwargs,
+            )
+
+            buffer = io.StringIO()
+            for chunk in responses:
+                if chunk.status_code != HTTPStatus.OK:
+                    raise RuntimeError(
+                        f"DashScope request failed ({chunk.status_code}): "
+                        f"{chunk.code} {chunk.message}"
+                    )
+                delta = chunk.output.text
+                if delta:
+                    buffer.write(delta)
+                    yield delta
+
+            text = buffer.getvalue()
+            span.set_attribute("response", text)
+            message = Message(
+                role="assistant",
+                content=text,
+                message_type=message_type,
+                metadata={
+                    'model': self.model_name,
+                }
+            )
+            if self.cache is not None and not kwargs:
+                self.cache.put(cache_bucket, messages, message)
+            return message
+        except Exception as e:
+            span.record_exception(e)
+            span.set_status(Status(StatusCode.ERROR, str(e)))
+            raise
+        finally:
+            span.end()
 
     async def completion_async(
-        self, 
-        messages: list[Message], 
-        temperature = 0.7, 
-        max_tokens = None, 
-        top_p = 0.9, 
-        stop = None, 
-        response_format = "text", 
-        **kwargs
+        self,
+        messages: list[Message],
+        temperature: float = 0.7,
+        max_tokens: int | None = None,
+        top_p: float = 0.9,
+        stop: list[str] | str | None = None,
+        response_format: Literal["text", "json"] = "text",
+        static_system: str | None = None,
+        **kwargs: dict[str, Any],
     ) -> Message:
-        raise NotImplementedError("Qwen LLM does not support async completion.")
\ No newline at end of file
+        messages = self._with_static_system(messages, static_system)
+        api_format, message_type = _FMT_MAP[response_format]
+        with self.tracer.start_as_current_span("qwen.completion_async") as span:
+            span.set_attribute("model_name", self.model_name)
+            span.set_attribute("messages.count", len(messages))
+            span.set_attribute("temperature", temperature)
+            span.set_attribute("response_format", response_format)
+            if span.is_recording():
+                span.set_attribute("input", self._encode_input(messages))
+
+            cache_bucket = self._cache_bucket(
+                temperature, top_p, max_tokens, stop, response_format
+            )
+            if self.cache is not None and not kwargs:
+                cached = self.cache.get(cache_bucket, messages)
+                span.set_attribute("cache.hit", cached is not None)
+                if cached is not None:
+                    return cached
+
+            parameters: dict[str, Any] = {
+                "temperature": temperature,
+                "top_p": top_p,
+                "response_format": {
+                    "type": api_format
+                },
+                **kwargs,
+            }
+            if max_tokens is not None:
+                parameters["max_tokens"] = max_tokens
+            if stop is not None:
+                parameters["stop"] = stop
+
+            state = await self._loop_state()
+            data = await _post_generation(
+                state.session,
+                self.__access_key,
+                {
+                    "model": self.model_name,
+                    "input": {"messages": self._to_request_messages(messages)},
+                    "parameters": parameters,
+                },
+            )
+
+            text = data["output"]["text"]
+            span.set_attribute("response", text)
+            message = Message(
+                role="assistant",
+                content=text,
+                message_type=message_type,
+                metadata={
+                    'model': self.model_name,
+                }
+            )
+            if self.cache is not None and not kwargs:
+                self.cache.put(cache_bucket, messages, message)
+            return message
+
+    async def completion_batched(
+        self,
+        messages: list[Message],
+        temperature: float = 0.7,
+        max_tokens: int | None = None,
+        top_p: float = 0.9,
+        stop: list[str] | str | None = None,
+        response_format: Literal["text", "json"] = "text",
+        static_system: str | None = None,
+        **kwargs: dict[str, Any],
+    ) -> Message:
+        """Like completion_async, but coalesced with calls made within the batch window.
+
+        DashScope has no multi-prompt endpoint, so every call is still its own HTTP
+        request; batching only groups concurrent calls under one dispatch span.
+        A non-zero ``batch_window`` adds up to that much latency to every call in
+        exchange for larger groups, so the default of 0 only groups calls made in
+        the same event loop tick.
+        """
+        state = await self._loop_state()
+        if state.batcher is None:
+            state.batcher = _CompletionBatcher(self, self._batch_window)
+        batcher = state.batcher
+        return await batcher.submit(
+            messages,
+            {
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "top_p": top_p,
+                "stop": stop,
+                "response_format": response_format,
+                "static_system": static_system,
+                **kwargs,
+            },
+        )
+
+    async def aclose(self) -> None:
+        """Release the async resources held for the running event loop.
+
+        ``asyncio.run()`` does this on its own when it shuts the loop down; call it
+        (or use ``async with``) when driving a loop by hand.
+        """
+        state = self._loop_states.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state.aclose()
+
+    async def _loop_state(self) -> "_LoopState":
+        loop = asyncio.get_running_loop()
+        state = self._loop_states.get(loop)
+        if state is not None:
+            return state
+
+        # Forget loops that were closed without shutting their generators down.
+        for stale in [other for other in self._loop_states if other.is_closed()]:
+            del self._loop_states[stale]
+
+        state = _LoopState()
+        self._loop_states[loop] = state
+        # asyncio.run() finalizes open async generators before it closes the loop,
+        # which closes the state together with its loop.
+        state.guard = self._close_on_shutdown(loop, state)
+        await anext(state.guard)
+        return state
+
+    async def _close_on_shutdown(
+        self, loop: asyncio.AbstractEventLoop, state: "_LoopState"
+    ) -> AsyncGenerator[None, None]:
+        try:
+            yield
+        finally:
+            if self._loop_states.get(loop) is state:
+                del self._loop_states[loop]
+            await state.aclose()
+
+    def _to_request_messages(self, messages: list[Message]) -> list[dict[str, str]]:
+        if len(self._request_messages) > _MAX_ENCODED_MESSAGES:
+            self._request_messages.clear()
+        request_messages = []
+        for message in messages:
+            request_message = self._request_messages.get(message.id)
+            if request_message is None:
+                request_message = {"role": message.role, "content": message.content}
+                self._request_messages[message.id] = request_message
+            request_messages.append(request_message)
+        return request_messages
+
+    def _encode_input(self, messages: list[Message]) -> str:
+        # Messages are treated as immutable once sent, so each is encoded only once.
+        if len(self._encoded_messages) > _MAX_ENCODED_MESSAGES:
+            self._encoded_messages.clear()
+        parts = []
+        for message in messages:
+            encoded = self._encoded_messages.get(message.id)
+            if encoded is None:
+                encoded = _json.dumps({"role": message.role, "content": message.content})
+                self._encoded_messages[message.id] = encoded
+            parts.append(encoded)
+        return (b"[" + b",".join(parts) + b"]").decode()
+
+    def _cache_bucket(
+        self,
+        temperature: float,
+        top_p: float,
+        max_tokens: int | None,
+        stop: list[str] | str | None,
+        response_format: str,
+    ) -> tuple:
+        return (
+            self.model_name,
+            temperature,
+            top_p,
+            max_tokens,
+            tuple(stop) if isinstance(stop, list) else stop,
+            response_format,
+        )
+
+
+class _LoopState:
+    """Async resources a Qwen instance holds on one event loop."""
+
+    def __init__(self) -> None:
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=64),
+            timeout=aiohttp.ClientTimeout(total=120),
+        )
+        self.batcher: _CompletionBatcher | None = None
+        self.guard: AsyncGenerator[None, None] | None = None
+
+    async def aclose(self) -> None:
+        if self.batcher is not None:
+            await self.batcher.aclose()
+        await self.session.close()
+
+
+class _CompletionBatcher:
+    """Collects completion requests for a short window and dispatches them together.
+
+    DashScope has no multi-prompt chat endpoint, so a batch is fanned out
+    concurrently over the shared session rather than sent as one request.
+    """
+
+    def __init__(self, llm: Qwen, window: float) -> None:
+        self._llm = llm
+        self._window = window
+        self._queue: asyncio.Queue[tuple[list[Message], dict[str, Any], asyncio.Future]] = (
+            asyncio.Queue()
+        )
+        self._pending: set[asyncio.Task] = set()
+        self._worker = asyncio.create_task(self._drain())
+
+    async def submit(self, messages: list[Message], params: dict[str, Any]) -> Message:
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((messages, params, future))
+        return await future
+
+    async def aclose(self) -> None:
+        tasks = [self._worker, *self._pending]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        # Calls still waiting for the next window will never be dispatched.
+        while not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            future.cancel()
+
+    async def _drain(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(self._window)
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            # Dispatch in the background so the next window starts immediately.
+            task = asyncio.create_task(self._dispatch(batch))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _dispatch(
+        self, batch: list[tuple[list[Message], dict[str, Any], asyncio.Future]]
+    ) -> None:
+        with self._llm.tracer.start_as_current_span("qwen.completion_batch") as span:
+            span.set_attribute("batch.size", len(batch))
+            results = await asyncio.gather(
+                *[self._llm.completion_async(messages, **params) for messages, params, _ in batch],
+                return_exceptions=True,
+            )
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+async def _post_generation(
+    session: aiohttp.ClientSession, access_key: str, body: dict[str, Any]
+) -> dict[str, Any]:
+    headers = {"Authorization": f"Bearer {access_key}"}
+    for attempt in range(_MAX_ATTEMPTS):
+        try:
+            async with session.post(
+                DASHSCOPE_GENERATION_URL, json=body, headers=headers
+            ) as response:
+                try:
+                    data = _json.loads(await response.read())
+                except ValueError:
+                    data = {}
+                if response.status == 200:
+                    return data
+                error = RuntimeError(
+                    f"DashScope request failed ({response.status}): "
+                    f"{data.get('code')} {data.get('message')}"
+                )
+                # Only rate limiting and server errors are worth retrying.
+                if response.status != 429 and response.status < 500:
+                    raise error
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = e
+        if attempt + 1 < _MAX_ATTEMPTS:
+            await asyncio.sleep(0.5 * 2**attempt)
+    raise error
@@ -0,0 +1,86 @@
+from llm.cache import LLMCache
+from minimal_agent.message import Message
+
+
+def _embed(text: str) -> list[float]:
+    return [text.count("a"), text.count("b"), 1.0]
+
+
+def test_exact_match_is_bucketed() -> None:
+    cache = LLMCache()
+    prompt = [Message(role="user", content="hello")]
+    answer = Message(role="assistant", content="hi")
+
+    cache.put(("qwen-plus", 0.7), prompt, answer)
+
+    assert cache.get(("qwen-plus", 0.7), prompt) is answer
+    assert cache.get(("qwen-plus", 0.1), prompt) is None
+    assert cache.get(("qwen-plus", 0.7), [Message(role="user", content="bye")]) is None
+
+
+def test_semantic_match_uses_threshold() -> None:
+    cache = LLMCache(embed=_embed, threshold=0.9)
+    answer = Message(role="assistant", content="cached")
+
+    cache.put("bucket", [Message(role="user", content="aab")], answer)
+
+    assert cache.get("bucket", [Message(role="user", content="aabb")]) is answer
+    assert cache.get("bucket", [Message(role="user", content="bbbbbb")]) is None
+
+
+def test_expired_entries_are_ignored() -> None:
+    cache = LLMCache(ttl=-1)
+    prompt = [Message(role="user", content="hello")]
+
+    cache.put("bucket", prompt, Message(role="assistant", content="hi"))
+
+    assert cache.get("bucket", prompt) is None
+
+
+def test_shared_system_prefix_does_not_match_semantically() -> None:
+    def truncating_embed(text: str) -> list[float]:
+        # Like a MiniLM-class model, only the start of the input is seen.
+        return _embed(text[:200]) + [text[:200].count("x")]
+
+    cache = LLMCache(embed=truncating_embed, threshold=0.9)
+    system = Message(role="system", content="x" * 1800)
+    answer = Message(role="assistant", content="cached")
+
+    cache.put("bucket", [system, Message(role="user", content="aaaa")], answer)
+
+    assert cache.get("bucket", [system, Message(role="user", content="bbbb")]) is None
+    assert cache.get("bucket", [system, Message(role="user", content="aaaab")]) is answer
+    other_system = Message(role="system", content="y" * 1800)
+    assert cache.get("bucket", [other_system, Message(role="user", content="aaaa")]) is None
+
+
+def test_max_entries_caps_all_buckets() -> None:
+    cache = LLMCache(embed=_embed, max_entries=2)
+    answer = Message(role="assistant", content="cached")
+
+    for bucket in ("a", "b", "c"):
+        cache.put(bucket, [Message(role="user", content="aab")], answer)
+
+    assert cache.get("a", [Message(role="user", content="aab")]) is None
+    assert cache.get("a", [Message(role="user", content="aabb")]) is None
+    assert cache.get("c", [Message(role="user", content="aabb")]) is answer
+    assert len(cache._exact) == 2
+    assert sum(len(index) for index in cache._semantic.values()) == 2
+
+
+def test_expired_best_match_does_not_hide_live_one(monkeypatch) -> None:
+    clock = [1000.0]
+    monkeypatch.setattr("llm.cache.time.time", lambda: clock[0])
+    cache = LLMCache(embed=_embed, threshold=0.9, ttl=10)
+    stale = Message(role="assistant", content="stale")
+    live = Message(role="assistant", content="live")
+
+    cache.put("bucket", [Message(role="user", content="aabb")], stale)
+    clock[0] += 8
+    cache.put("bucket", [Message(role="user", content="aaabb")], live)
+    clock[0] += 5
+
+    assert cache.get("bucket", [Message(role="user", content="aabb ")]) is live
+
+    cache.put("bucket", [Message(role="user", content="bbbbbbbb")], live)
+    assert len(cache._exact) == 2
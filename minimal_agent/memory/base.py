@@ -1,18 +1,22 @@
 from abc import ABC, abstractmethod
-from typing import Any, TypedDict, TypeVar
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+import numpy as np
 
 MemoryType = TypeVar('MemoryType', bound='Memory')
 
-class MemoryEntry(TypedDict):
+@dataclass(slots=True)
+class MemoryEntry:
     role: str  # user, assistant, system, tool, observation
     content: str
     timestamp: float
-    metadata: dict[str, Any]
+    metadata: dict[str, Any] = field(default_factory=dict)
 
 
 class Memory(ABC):
     @abstractmethod
-    def add(self, entry: MemoryEntry) -> None:
+    def add(self, entry: MemoryEntry | dict[str, Any]) -> None:
         pass
 
     @abstractmethod
@@ -25,14 +29,86 @@ class Memory(ABC):
 
 
 class ListMemory(Memory):
-    def __init__(self):
-        self.entries: list[MemoryEntry] = []
+    """Bounded memory stored column-wise, with timestamps in a numpy array.
+
+    Entries are expected to arrive in non-decreasing timestamp order (the
+    agents stamp them with ``time.time()`` as they go); ``get_range`` relies
+    on this to binary-search the timestamp column.
+    """
+
+    # Oldest entries are dropped once this many are held.
+    MAX_ENTRIES = 10_000
+    # Timestamp array growth step.
+    _TS_CHUNK = 1024
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self._max_entries = max_entries
+        self._roles: list[str] = []
+        self._contents: list[str] = []
+        self._metadatas: list[dict[str, Any]] = []
+        self._ts = np.empty(self._TS_CHUNK, dtype=np.float64)
+        # Index of the oldest live entry; evicted rows stay behind it until
+        # the next compaction.
+        self._start = 0
+
+    def __len__(self) -> int:
+        return len(self._roles) - self._start
 
-    def add(self, entry: MemoryEntry) -> None:
-        self.entries.append(entry)
+    def add(self, entry: MemoryEntry | dict[str, Any]) -> None:
+        if isinstance(entry, dict):
+            entry = MemoryEntry(**entry)
+
+        end = len(self._roles)
+        if end == len(self._ts):
+            end = self._reserve()
+        self._ts[end] = entry.timestamp
+        self._roles.append(entry.role)
+        self._contents.append(entry.content)
+        self._metadatas.append(entry.metadata)
+
+        if end + 1 - self._start > self._max_entries:
+            self._start += 1
 
     def get_recent(self, limit: int = 10) -> list[MemoryEntry]:
-        return self.entries[-limit:] if self.entries else []
+        end = len(self._roles)
+        return self._slice(max(self._start, end - max(limit, 0)), end)
+
+    def get_range(self, t0: float, t1: float) -> list[MemoryEntry]:
+        """Return the entries with ``t0 <= timestamp <= t1``, oldest first."""
+        timestamps = self._ts[self._start : len(self._roles)]
+        lo = int(np.searchsorted(timestamps, t0, side="left"))
+        hi = int(np.searchsorted(timestamps, t1, side="right"))
+        return self._slice(self._start + lo, self._start + hi)
 
     def clear(self) -> None:
-        self.entries = []
+        self._roles.clear()
+        self._contents.clear()
+        self._metadatas.clear()
+        self._ts = np.empty(self._TS_CHUNK, dtype=np.float64)
+        self._start = 0
+
+    def _slice(self, lo: int, hi: int) -> list[MemoryEntry]:
+        return [
+            MemoryEntry(role, content, float(timestamp), metadata)
+            for role, content, timestamp, metadata in zip(
+                self._roles[lo:hi],
+                self._contents[lo:hi],
+                self._ts[lo:hi],
+                self._metadatas[lo:hi],
+            )
+        ]
+
+    def _reserve(self) -> int:
+        """Make room for one more row and return the index it goes to."""
+        end = len(self._roles)
+        if self._start * 2 >= len(self._ts):
+            # Mostly evicted rows: drop them instead of growing.
+            live = end - self._start
+            self._ts[:live] = self._ts[self._start : end]
+            del self._roles[: self._start]
+            del self._contents[: self._start]
+            del self._metadatas[: self._start]
+            self._start = 0
+            return live
+        self._ts = np.resize(self._ts, len(self._ts) + self._TS_CHUNK)
+        return end
@@ -0,0 +1,28 @@
+from memory.base import ListMemory, MemoryEntry
+
+
+def test_get_recent_and_eviction() -> None:
+    memory = ListMemory(max_entries=3000)
+    for i in range(5000):
+        memory.add(MemoryEntry("user", str(i), float(i)))
+
+    assert len(memory) == 3000
+    assert [e.content for e in memory.get_recent(2)] == ["4998", "4999"]
+    assert memory.get_recent(0) == []
+    assert memory.get_recent(10_000)[0].content == "2000"
+
+
+def test_get_range_is_inclusive() -> None:
+    memory = ListMemory()
+    for i in range(10):
+        memory.add({"role": "user", "content": str(i), "timestamp": float(i), "metadata": {"i": i}})
+
+    entries = memory.get_range(2.0, 4.0)
+
+    assert [e.content for e in entries] == ["2", "3", "4"]
+    assert entries[0] == MemoryEntry("user", "2", 2.0, {"i": 2})
+    assert memory.get_range(20.0, 30.0) == []
+
+    memory.clear()
+    assert len(memory) == 0
+    assert memory.get_recent() == []
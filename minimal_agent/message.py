@@ -1,9 +1,10 @@
-from datetime import datetime
+import time
+from dataclasses import dataclass, field
 from enum import StrEnum
 import uuid
 from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from minimal_agent import _json
 
 
 class MessageTypeEnum(StrEnum):
@@ -11,15 +12,14 @@ class MessageTypeEnum(StrEnum):
     JSON = "json"
 
 
-class Message(BaseModel):
-    id: str = Field(
-        default_factory=lambda: str(uuid.uuid4()),
-    )
+@dataclass(slots=True, kw_only=True)
+class Message:
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
     role: Literal["user", "system", "assistant"]
     content: str
-    message_type: MessageTypeEnum = Field(
-        default=MessageTypeEnum.TEXT,
-    )
+    message_type: MessageTypeEnum = MessageTypeEnum.TEXT
     metadata: dict[str, Any] | None = None
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: float = field(default_factory=time.time)
 
+    def to_json_bytes(self) -> bytes:
+        return _json.dumps(self)
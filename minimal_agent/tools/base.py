@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from collections.abc import Callable
 from enum import StrEnum
@@ -22,14 +23,22 @@ class ToolsTypeEnum(StrEnum):
 
 class Tools(Generic[P, ValueType]):
     def __init__(
-        self, name: str, description: str, args: list[Arg], func: Callable[P, ValueType]
+        self,
+        name: str,
+        description: str,
+        args: list[Arg],
+        func: Callable[P, ValueType],
+        cacheable: bool = True,
     ) -> None:
         self._meta = ToolDesc(
             name=name,
             description=description,
             args=args,
+            cacheable=cacheable,
         )
         self._func = func
+        # Hot entry point: the wrapped function itself, skipping the __call__ frame.
+        self.call: Callable[P, ValueType] = func
 
     @property
     @abstractmethod
@@ -57,3 +66,19 @@ class Tools(Generic[P, ValueType]):
 
     def __call__(self, *args: P.args, **kwargs: P.kwargs) -> ValueType:
         return self._func(*args, **kwargs)
+
+    def is_cacheable_result(self, result: ValueType) -> bool:
+        """Whether a result may be reused for later calls with the same params.
+
+        Tools that report failure by returning an ``{"error": ...}`` dict (or a list
+        holding one) rather than raising must not have it cached, or a retry would
+        never reach the tool again.
+        """
+        if isinstance(result, dict):
+            return "error" not in result
+        if isinstance(result, list):
+            return not any(isinstance(item, dict) and "error" in item for item in result)
+        return True
+
+    async def execute_async(self, *args: P.args, **kwargs: P.kwargs) -> ValueType:
+        return await asyncio.to_thread(self._func, *args, **kwargs)
@@ -1,35 +1,115 @@
 from collections.abc import Callable
+import dataclasses
 import re
 import inspect
 
 from minimal_agent.tools.base import ToolDocsParser
 from minimal_agent.tools.types import Arg, ToolDesc
 
+_SECTION_HEADERS = frozenset(
+    {
+        "Args",
+        "Returns",
+        "Yields",
+        "Raises",
+        "Examples",
+        "Note",
+        "Notes",
+        "Attributes",
+        "Todo",
+        "Warning",
+        "Warnings",
+    }
+)
+# Parsed ToolDescs are memoized on the function itself, so the cache lives and
+# dies with it instead of pinning every function (and bound instance) forever.
+_TOOL_DESC_ATTR = "__minimal_agent_tool_desc__"
+# One match per "name (type): description" line of an Args block.
+_ARG_RE = re.compile(
+    r"^(?P<key>.*?)[^\S\n]*(?:\((?P<type>.*?)\))?[^\S\n]*:[^\S\n]*(?P<desc>.+)",
+    re.MULTILINE,
+)
 
-class GoogleStyleDocsParser(ToolDocsParser):
-    def parse(self, func: Callable, content: str) -> ToolDesc:
-        func_name = func.__name__
-        desc = ""
-        args: list[Arg] = []
 
-        pattern = re.compile(
-            r"(?s)(?P<section>Args|Returns|Raises|Examples):\s*\n(?P<content>(.*?)(?:\n\s*))\n\s*(?!Returns|Raises|Yields|Examples|Note|Notes|Attributes|Todo|Warning|Warnings)",
-            re.MULTILINE,
-        )
-        matches = pattern.finditer(content)
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip())
 
-        description_match = re.match(
-            r"^(?P<description>.*?)(?=\n\n|\Z)", content, re.DOTALL
-        )
-        if description_match:
-            desc = description_match.group("description").strip()
 
-        for match in matches:
-            section = match.group("section")
-            content_slice = match.group("content").strip()
+def _split_sections(content: str) -> tuple[str, dict[str, str]]:
+    """Split a docstring into its summary and its sections in a single line scan.
+
+    The summary is the first paragraph. A section starts at a ``Header:`` line
+    and runs until the next header or a line indented no deeper than it.
+    """
+    summary: list[str] = []
+    sections: dict[str, str] = {}
+    in_summary = True
+    current: str | None = None
+    header_indent = 0
+    buffer: list[str] = []
+
+    for line in content.splitlines():
+        stripped = line.strip()
+
+        if stripped.endswith(":") and stripped[:-1] in _SECTION_HEADERS:
+            if current is not None:
+                sections[current] = "\n".join(buffer)
+            in_summary = False
+            current, header_indent, buffer = stripped[:-1], _indent(line), []
+            continue
+
+        if in_summary:
+            if stripped:
+                summary.append(stripped)
+            elif summary:
+                in_summary = False
+            continue
+
+        if current is not None:
+            if stripped and _indent(line) <= header_indent:
+                sections[current] = "\n".join(buffer)
+                current = None
+            else:
+                buffer.append(line)
+
+    if current is not None:
+        sections[current] = "\n".join(buffer)
+
+    return "\n".join(summary), sections
 
-            if section == "Args":
-                args = self._parse_args(content_slice)
+
+def _copy_tool_desc(tool_desc: ToolDesc) -> ToolDesc:
+    return dataclasses.replace(
+        tool_desc, args=[dataclasses.replace(arg) for arg in tool_desc.args]
+    )
+
+
+class GoogleStyleDocsParser(ToolDocsParser):
+    def parse(self, func: Callable, content: str) -> ToolDesc:
+        # Tools are often re-registered from the same function; parse each docstring
+        # once. Bound methods don't take attributes, so memoize on the function
+        # behind them; the key keeps bound and plain signatures apart.
+        target = getattr(func, "__func__", func)
+        key = (type(self), content, target is not func)
+        memo = getattr(target, _TOOL_DESC_ATTR, None)
+        if memo is not None and key in memo:
+            return _copy_tool_desc(memo[key])
+
+        tool_desc = self._parse(func, content)
+        try:
+            if memo is None:
+                memo = {}
+                setattr(target, _TOOL_DESC_ATTR, memo)
+            memo[key] = tool_desc
+        except (AttributeError, TypeError):
+            # Builtins and other objects without a __dict__ are parsed every time.
+            pass
+        return _copy_tool_desc(tool_desc)
+
+    def _parse(self, func: Callable, content: str) -> ToolDesc:
+        func_name = func.__name__
+        desc, sections = _split_sections(content)
+        args = self._parse_args(sections["Args"]) if "Args" in sections else []
 
         args_name_map = {arg.arg_name: arg for arg in args}
 
@@ -57,26 +137,11 @@ class GoogleStyleDocsParser(ToolDocsParser):
         )
 
     def _parse_args(self, content: str) -> list[Arg]:
-        args = []
-        pattern = re.compile(
-            r"(?P<key>.*?)\s*\s*(?:\((?P<type>.*?)\))?\s*:\s*(?P<desc>.+)"
-        )
-
-        for line in content.split("\n"):
-            if line.strip():
-                match_args = pattern.match(line)
-
-                if match_args:
-                    arg_name = match_args.group("key").strip()
-                    arg_type = match_args.group("type")
-                    arg_desc = match_args.group("desc").strip()
-                    args.append(
-                        Arg(
-                            arg_name=arg_name,
-                            arg_type=arg_type,
-                            arg_desc=arg_desc,
-                        )
-                    )
-        return args
-
-
+        return [
+            Arg(
+                arg_name=match_args.group("key").strip(),
+                arg_type=match_args.group("type"),
+                arg_desc=match_args.group("desc").strip(),
+            )
+            for match_args in _ARG_RE.finditer(content)
+        ]
@@ -1,6 +1,8 @@
+import functools
 import os
 import re
 from tempfile import template
+from types import CodeType
 from typing import NamedTuple, ParamSpec
 import importlib
 import traceback
@@ -17,6 +19,13 @@ from RestrictedPython import limited_builtins
 from RestrictedPython import utility_builtins
 from RestrictedPython.PrintCollector import PrintCollector
 
+
+# Keyed on the source itself: str hashes are cached, so a hit costs less than hashing it again.
+@functools.lru_cache(maxsize=512)
+def _compile_restricted(code: str) -> CodeType:
+    return compile_restricted(code, filename='<inline code>', mode='exec')
+
+
 class ImagePath(BaseModel):
     name: str
     url: str
@@ -36,7 +45,9 @@ class PythonExecutorResult(BaseModel):
 P = ParamSpec("P")
 
 class PythonExecutor(Tools[P, str]):
-    PLT_SAVE_PATTERN = re.compile(r"plt\.savefig\((.*)\)")
+    # Only a string-literal file name is rewritten; the rest of the call (kwargs and
+    # the closing paren) is left as written.
+    PLT_SAVE_PATTERN = re.compile(r"""plt\.savefig\(\s*(['"])(.+?)\1""")
     def __init__(
             self,
             allow_module_set: frozenset[str] = frozenset(),
@@ -60,10 +71,21 @@ Action Input: ```python <code> ```
 
             ],
             func=self._inner_execute,
+            # Executed code can have side effects (e.g. saving figures), never reuse results.
+            cacheable=False,
         )
         self._allow_module_set = allow_module_set
         self._is_allow_any = is_allow_any
         self._storage_path = storage_path
+        self._restricted_builtins = {
+            **safe_builtins,
+            **limited_builtins,
+            **utility_builtins,
+            '_print_': PrintCollector,
+            "__import__": self._safe_import,
+            "_getitem_": lambda x, y: x[y],
+            "_write_": lambda x: x
+        }
 
     def tool_type(self) -> ToolsTypeEnum:
         return ToolsTypeEnum.CODE_EXECUTOR
@@ -74,34 +96,13 @@ Action Input: ```python <code> ```
         # Prepare a dictionary to store outputs
         output = []
 
-        def _safe_import(name, *args, **kwargs):
-            if not self._is_allow_any and name not in self._allow_module_set:
-                raise ImportError(f"Importing module '{name}' is not allowed.")
-
-            return __import__(name, *args, **kwargs)
-
-
         code_new, images = self._replace_plt_save(code)
 
         try:
-            byte_code = compile_restricted(
-                code_new,
-                filename='<inline code>',
-                mode='exec'
-            )
+            byte_code = _compile_restricted(code_new)
 
-            # Create a safe globals dictionary with allowed imports
-            restricted_globals = {
-                '__builtins__': {
-                    **safe_builtins,
-                    **limited_builtins,
-                    **utility_builtins,
-                    '_print_': PrintCollector,
-                    "__import__": _safe_import,
-                    "_getitem_": lambda x, y: x[y],
-                    "_write_": lambda x: x
-                },
-            }
+            # Executed code may mutate its builtins, so each run gets its own copy.
+            restricted_globals = {'__builtins__': self._restricted_builtins.copy()}
             local_vars = {}
 
             # Execute the code with restricted globals
@@ -119,19 +120,20 @@ Action Input: ```python <code> ```
             print(traceback.format_exc())
             return PythonExecutorResult(error=f"Error during execution: {str(e)}")
 
+    def _safe_import(self, name, *args, **kwargs):
+        if not self._is_allow_any and name not in self._allow_module_set:
+            raise ImportError(f"Importing module '{name}' is not allowed.")
+
+        return __import__(name, *args, **kwargs)
+
     def _replace_plt_save(self, code: str) -> PltReplacedCode:
         """Replace plt.show() to save images."""
         images = []
-        code_lines = code.split('\n')
-        new_code_lines = []
-
-        for line in code_lines:
-            match = self.PLT_SAVE_PATTERN.search(line)
-            if match:
-                image_name = match.group(1).strip().strip('"').strip("'")
-                image_path = os.path.join(self._storage_path, image_name)
-                images.append(ImagePath(name=image_name, url=f'file://{os.path.abspath(image_path)}'))
-                line = line.replace(match.group(0), f"plt.savefig('{image_path}')")
-            new_code_lines.append(line)
-
-        return PltReplacedCode(code='\n'.join(new_code_lines), images=images)
+
+        def _repl(match: re.Match) -> str:
+            image_name = match.group(2)
+            image_path = os.path.join(self._storage_path, image_name)
+            images.append(ImagePath(name=image_name, url=f'file://{os.path.abspath(image_path)}'))
+            return f"plt.savefig({image_path!r}"
+
+        return PltReplacedCode(code=self.PLT_SAVE_PATTERN.sub(_repl, code), images=images)
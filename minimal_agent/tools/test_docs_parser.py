@@ -45,3 +45,41 @@ def test_google_parse() -> None:
     assert result.args[1].arg_type == 'int'
     assert result.args[1].arg_desc == '第二个整数。'
 
+
+
+def test_google_parse_is_cached() -> None:
+    parser = GoogleStyleDocsParser()
+
+    assert add_numbers.__doc__
+
+    first = parser.parse(add_numbers, add_numbers.__doc__)
+    second = parser.parse(add_numbers, add_numbers.__doc__)
+
+    assert hasattr(add_numbers, "__minimal_agent_tool_desc__")
+    assert second == first
+    # Each caller gets its own copy, so mutating one can't corrupt later results.
+    assert second is not first and second.args is not first.args
+    first.args.append(first.args[0])
+    first.args[0].arg_desc = "changed"
+    third = parser.parse(add_numbers, add_numbers.__doc__)
+    assert len(third.args) == 2
+    assert third.args[0].arg_desc == "第一个整数。"
+
+
+def test_google_parse_bound_method() -> None:
+    class Calculator:
+        def add(self, a: int, b: int) -> int:
+            """Add numbers.
+
+            Args:
+                a (int): first.
+                b (int): second.
+            """
+            return a + b
+
+    calculator = Calculator()
+    bound = GoogleStyleDocsParser().parse(calculator.add, Calculator.add.__doc__)
+    plain = GoogleStyleDocsParser().parse(Calculator.add, Calculator.add.__doc__)
+
+    assert [arg.arg_name for arg in bound.args] == ["a", "b"]
+    assert [arg.arg_name for arg in plain.args] == ["a", "b", "self"]
@@ -0,0 +1,30 @@
+from tools.python_executor import PythonExecutor
+
+
+def _replace(code: str):
+    return PythonExecutor(storage_path="/tmp/plots")._replace_plt_save(code)
+
+
+def test_replace_literal_keeps_kwargs() -> None:
+    replaced = _replace('plt.savefig("fig.png", dpi=200)')
+
+    assert replaced.code == "plt.savefig('/tmp/plots/fig.png', dpi=200)"
+    assert [image.name for image in replaced.images] == ["fig.png"]
+
+
+def test_replace_two_calls_on_one_line() -> None:
+    replaced = _replace("plt.savefig('a.png'); plt.savefig('b.png', bbox_inches='tight')")
+
+    assert replaced.code == (
+        "plt.savefig('/tmp/plots/a.png'); plt.savefig('/tmp/plots/b.png', bbox_inches='tight')"
+    )
+    assert [image.name for image in replaced.images] == ["a.png", "b.png"]
+
+
+def test_non_literal_path_is_left_alone() -> None:
+    code = 'plt.savefig(os.path.join(d, "x.png"), dpi=100)'
+    replaced = _replace(code)
+
+    assert replaced.code == code
+    assert replaced.images == []
+    compile(replaced.code, "<test>", "exec")
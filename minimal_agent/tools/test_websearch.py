@@ -0,0 +1,21 @@
+from tools.websearch import SearxngWebSearch
+
+
+def test_clean_markdown_spaces_headings() -> None:
+    cleaned = SearxngWebSearch.clean_markdown("X\n# H\nbody\n# A\n# B")
+
+    assert cleaned == "X\n\n# H\n\nbody\n\n# A\n\n# B"
+
+
+def test_clean_markdown_rewrites_rules() -> None:
+    assert SearxngWebSearch.clean_markdown("a\n--------\nb") == "a\n---\nb"
+
+
+def test_clean_markdown_collapses_blank_lines() -> None:
+    assert SearxngWebSearch.clean_markdown("\n\n\na\n   \n  \n\n b") == "a\n\nb"
+
+
+def test_clean_markdown_needs_a_space_after_hashes() -> None:
+    cleaned = SearxngWebSearch.clean_markdown("text\nissue # 5\n#tag\nmore")
+
+    assert cleaned == "text\nissue # 5\n#tag\nmore"
@@ -1,14 +1,17 @@
-from pydantic import BaseModel, Field
+from dataclasses import dataclass
 
 
-class Arg(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class Arg:
     arg_name: str
     arg_desc: str
     arg_type: str | None
-    required: bool = Field(default=False, description="是否必填参数")
+    required: bool = False  # 是否必填参数
 
 
-class ToolDesc(BaseModel):
-    name: str = Field(description="tool name")
-    description: str = Field(description="tool description")
-    args: list[Arg] = Field(description="tools arguments")
\ No newline at end of file
+@dataclass(slots=True, kw_only=True)
+class ToolDesc:
+    name: str  # tool name
+    description: str  # tool description
+    args: list[Arg]  # tools arguments
+    cacheable: bool = True  # whether identical calls may reuse a previous result
@@ -1,21 +1,65 @@
+import asyncio
+import atexit
+import functools
+import importlib.util
 import logging
+import multiprocessing
+import os
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet
+from urllib3.util.retry import Retry
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import ParamSpec, List, Dict, Any, Optional
 from datetime import datetime
 import re
 from bs4 import BeautifulSoup
 from markdownify import markdownify as md
 
+from minimal_agent import _json
 from minimal_agent.tools.base import Tools, ToolsTypeEnum
 from minimal_agent.tools.types import Arg
 
 P = ParamSpec("P")
 
+_FETCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+_FETCH_ATTEMPTS = 3
+# lxml is several times faster than the pure-Python parser when it is installed.
+_HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+_HR_RE = re.compile(r"-{4,}")
+_HEADING_RE = re.compile(r"#{1,6} ")
+
 
 class SearxngWebSearch(Tools[P, List[Dict[str, Any]]]):
-    def __init__(self, searx_host: str = "http://localhost:8888", count: int = 10):
+    """Web search through SearxNG, with each result page converted to markdown.
+
+    Pages are converted on worker threads by default. Pass ``process_pool=True``
+    to convert them in a shared process pool instead, which scales across cores
+    but re-imports the caller's ``__main__`` in every worker, so the calling
+    script needs the usual ``if __name__ == "__main__":`` guard.
+    """
+
+    def __init__(
+        self,
+        searx_host: str = "http://localhost:8888",
+        count: int = 10,
+        process_pool: bool = False,
+    ):
         self.searx_host = searx_host
         self.count = count
+        self._process_pool = process_pool
+        # Keep-alive connections to the SearxNG host are reused across searches.
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.3),
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
         super().__init__(
             name="searxng_websearch",
             description="Perform a web search using the SearxNG search engine.",
@@ -34,10 +78,11 @@ class SearxngWebSearch(Tools[P, List[Dict[str, Any]]]):
     def tool_type(self) -> ToolsTypeEnum:
         return ToolsTypeEnum.WEB_SEARCH
 
+    @staticmethod
     def clean_html(
-        self, html_content: str, main_content_selector: Optional[str] = None
+        html_content: str, main_content_selector: Optional[str] = None
     ) -> str:
-        soup = BeautifulSoup(html_content, "html.parser")
+        soup = BeautifulSoup(html_content, _HTML_PARSER)
 
         for tag in soup.select(
             "script, style, nav, footer, header, aside, .ads, .advertisement, .banner, .comments, iframe"
@@ -46,7 +91,8 @@ class SearxngWebSearch(Tools[P, List[Dict[str, Any]]]):
 
         return str(soup)
 
-    def html_to_markdown(self, html_content: str, **options) -> str:
+    @staticmethod
+    def html_to_markdown(html_content: str, **options) -> str:
         default_options = {
             "heading_style": "atx",
             "convert": [
@@ -80,21 +126,36 @@ class SearxngWebSearch(Tools[P, List[Dict[str, Any]]]):
 
         markdown = md(html_content, **default_options)
 
-        markdown = self.clean_markdown(markdown)
+        markdown = SearxngWebSearch.clean_markdown(markdown)
 
         return markdown
 
-    def clean_markdown(self, markdown_text: str) -> str:
-        markdown_text = re.sub(r"\n{3,}", "\n\n", markdown_text)
-
-        markdown_text = "\n".join([line.strip() for line in markdown_text.split("\n")])
-
-        markdown_text = re.sub(r"-{4,}", "---", markdown_text)
+    @staticmethod
+    def clean_markdown(markdown_text: str) -> str:
+        lines: list[str] = []
+        after_heading = False
+
+        for line in markdown_text.split("\n"):
+            line = line.strip()
+            if not line:
+                # Collapse runs of blank lines into one.
+                if lines and lines[-1]:
+                    lines.append("")
+                after_heading = False
+                continue
 
-        markdown_text = re.sub(r"([^\n])(\n#{1,6} )", r"\1\n\n\2", markdown_text)
-        markdown_text = re.sub(r"(#{1,6} .+?)(\n[^#\n])", r"\1\n\n\2", markdown_text)
+            if "----" in line:
+                line = _HR_RE.sub("---", line)
+            is_heading = _HEADING_RE.match(line) is not None
+            # Headings get a blank line before them and before the text after them.
+            if lines and lines[-1] and (
+                is_heading or (after_heading and not line.startswith("#"))
+            ):
+                lines.append("")
+            lines.append(line)
+            after_heading = is_heading
 
-        return markdown_text
+        return "\n".join(lines)
 
     def _inner_format_result(
         self, output: List[Dict[str, Any]]
@@ -102,75 +163,120 @@ class SearxngWebSearch(Tools[P, List[Dict[str, Any]]]):
         """
         Format the search results into a structured list with enhanced content processing.
         """
-        structured_citations = []
-
-        for result in output[:self.count]:
-            url = result.get("url")
-            if not url:
-                continue
-
-            try:
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                }
-                page_response = requests.get(url, headers=headers, timeout=10)
-                page_response.raise_for_status()
-
-                if page_response.encoding == "ISO-8859-1":
-                    page_response.encoding = page_response.apparent_encoding
-
-                cleaned_html = self.clean_html(
-                    page_response.text
-                )
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._inner_format_result_async(output))
+
+        # Called from a thread that is already running a loop (e.g. Jupyter, or the
+        # sync agent driven from async code): run a fresh loop on a worker thread.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(
+                lambda: asyncio.run(self._inner_format_result_async(output))
+            ).result()
+
+    async def _inner_format_result_async(
+        self, output: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch all result pages concurrently and format them like `_inner_format_result`.
+        """
+        results = [result for result in output[:self.count] if result.get("url")]
+
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit_per_host=4),
+            headers=_FETCH_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as session:
+            markdowns = await asyncio.gather(
+                *(self._fetch_markdown(session, result["url"]) for result in results),
+                return_exceptions=True,
+            )
 
-                markdown_text = self.html_to_markdown(cleaned_html)
-
-                citation = {
-                    "source": result.get("engines", ["Unknown"])[
-                        0
-                    ],
-                    "author": result.get("author", "Unknown"),
-                    "title": result.get("title", "Unknown"),
-                    "url": url,
-                    "datePublished": result.get(
-                        "publishedDate", datetime.now().strftime("%Y-%m-%d")
-                    ),
-                    "accessedDate": datetime.now().strftime("%Y-%m-%d"),
-                    "markdownContent": markdown_text,
-                }
-
-                if len(markdown_text) > 500:
-                    citation["summary"] = markdown_text[:500] + "..."
-                else:
-                    citation["summary"] = markdown_text
-
-                structured_citations.append(citation)
-
-            except requests.RequestException as e:
-                logging.error(f"Error fetching {url}: {e}")
+        structured_citations = []
+        for result, markdown_text in zip(results, markdowns):
+            url = result["url"]
+            if isinstance(markdown_text, (aiohttp.ClientError, asyncio.TimeoutError)):
+                logging.error(f"Error fetching {url}: {markdown_text}")
                 structured_citations.append(
-                    {
-                        "source": result.get("engines", ["Unknown"])[0],
-                        "title": result.get("title", "Unknown"),
-                        "url": url,
-                        "error": str(e),
-                        "markdownContent": f"*Error fetching content: {str(e)}*",
-                    }
+                    self._error_citation(result, markdown_text, "Error fetching content")
                 )
-            except Exception as e:
-                logging.error(f"Error processing {url}: {e}")
+            elif isinstance(markdown_text, BaseException):
+                logging.error(f"Error processing {url}: {markdown_text}")
                 structured_citations.append(
-                    {
-                        "source": result.get("engines", ["Unknown"])[0],
-                        "title": result.get("title", "Unknown"),
-                        "url": url,
-                        "error": str(e),
-                        "markdownContent": f"*Error processing content: {str(e)}*",
-                    }
+                    self._error_citation(result, markdown_text, "Error processing content")
                 )
+            else:
+                structured_citations.append(self._citation(result, markdown_text))
 
         return structured_citations
 
+    async def _fetch_markdown(self, session: aiohttp.ClientSession, url: str) -> str:
+        page = await self._fetch_page(session, url)
+        # HTML parsing is CPU bound, so keep it off the event loop.
+        if self._process_pool:
+            return await asyncio.get_running_loop().run_in_executor(
+                _get_process_pool(), _process_html, page
+            )
+        return await asyncio.to_thread(_process_html, page)
+
+    async def _fetch_page(self, session: aiohttp.ClientSession, url: str) -> str:
+        for attempt in range(_FETCH_ATTEMPTS):
+            try:
+                async with session.get(url) as page_response:
+                    page_response.raise_for_status()
+                    body = await page_response.read()
+                    encoding = page_response.charset
+                    # Same fallback as requests' apparent_encoding for unlabelled pages.
+                    if encoding is None or encoding.lower() == "iso-8859-1":
+                        encoding = chardet.detect(body)["encoding"] or "utf-8"
+                    return body.decode(encoding, errors="replace")
+            except aiohttp.ClientResponseError as e:
+                # Client errors other than rate limiting will not go away on retry.
+                if e.status != 429 and e.status < 500:
+                    raise
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            if attempt + 1 < _FETCH_ATTEMPTS:
+                await asyncio.sleep(0.5 * 2**attempt)
+        raise error
+
+    @staticmethod
+    def _citation(result: Dict[str, Any], markdown_text: str) -> Dict[str, Any]:
+        citation = {
+            "source": result.get("engines", ["Unknown"])[
+                0
+            ],
+            "author": result.get("author", "Unknown"),
+            "title": result.get("title", "Unknown"),
+            "url": result["url"],
+            "datePublished": result.get(
+                "publishedDate", datetime.now().strftime("%Y-%m-%d")
+            ),
+            "accessedDate": datetime.now().strftime("%Y-%m-%d"),
+            "markdownContent": markdown_text,
+        }
+
+        if len(markdown_text) > 500:
+            citation["summary"] = markdown_text[:500] + "..."
+        else:
+            citation["summary"] = markdown_text
+
+        return citation
+
+    @staticmethod
+    def _error_citation(
+        result: Dict[str, Any], error: BaseException, message: str
+    ) -> Dict[str, Any]:
+        return {
+            "source": result.get("engines", ["Unknown"])[0],
+            "title": result.get("title", "Unknown"),
+            "url": result["url"],
+            "error": str(error),
+            "markdownContent": f"*{message}: {str(error)}*",
+        }
+
     def _inner_websearch(self, query: str) -> List[Dict[str, Any]]:
         url = f"{self.searx_host}/search"
 
@@ -182,11 +288,11 @@ class SearxngWebSearch(Tools[P, List[Dict[str, Any]]]):
         }
 
         try:
-            response = requests.get(url, params=params, timeout=15)
+            response = self._session.get(url, params=params, timeout=15)
 
             response.raise_for_status()
 
-            results = response.json()
+            results = _json.loads(response.content)
 
             return self._inner_format_result(results["results"])
         except requests.RequestException as e:
@@ -197,3 +303,24 @@ class SearxngWebSearch(Tools[P, List[Dict[str, Any]]]):
             # Handle any errors that may occur while parsing the response
             logging.error(f"An error occurred while parsing the response: {e}")
             return [{"error": f"Failed to parse search results: {str(e)}"}]
+
+
+def _process_html(html_content: str) -> str:
+    return SearxngWebSearch.html_to_markdown(SearxngWebSearch.clean_html(html_content))
+
+
+@functools.cache
+def _get_process_pool() -> ProcessPoolExecutor:
+    # Shared by all instances; worker processes are only started on first use.
+    # The tool always runs in a multithreaded process (worker threads, exporter
+    # threads), where forking is unsafe, so workers come from a fork server where
+    # the platform has one (spawn elsewhere, e.g. Windows).
+    start_method = (
+        "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    )
+    pool = ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context(start_method),
+    )
+    atexit.register(pool.shutdown)
+    return pool